@@ -1,11 +1,15 @@
 import os
+import json
+import time
+import uuid
+import threading
 import cv2
 import numpy as np
 import base64
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS
+from flask_sock import Sock
 from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
 from dotenv import load_dotenv
 
 # Load environment variables from backend/.env
@@ -38,6 +42,9 @@ os.environ['TF_FORCE_GPU_ALLOW_GROWTH'] = 'true'
 # Configure TensorFlow for memory efficiency
 import tensorflow as tf
 tf.config.set_soft_device_placement(True)
+# Optional CPU thread limit for inference (also used by the TFLite / ONNX backends)
+if int(os.getenv('INFERENCE_THREADS', '0')) > 0:
+    tf.config.threading.set_intra_op_parallelism_threads(int(os.getenv('INFERENCE_THREADS')))
 # Limit TensorFlow memory usage
 gpus = tf.config.list_physical_devices('GPU')
 if gpus:
@@ -49,14 +56,68 @@ if gpus:
 
 app = Flask(__name__)
 CORS(app)
+sock = Sock(app)
+
+# LLM response cache (in-memory LRU, plus SQLite when LLM_CACHE_DB is set)
+from llm_cache import LLMCache
+llm_cache = LLMCache(
+    max_entries=int(os.getenv('LLM_CACHE_SIZE', '1024')),
+    db_path=os.getenv('LLM_CACHE_DB') or None,
+    max_disk_entries=int(os.getenv('LLM_CACHE_DISK_SIZE', '10000'))
+) if os.getenv('LLM_CACHE', 'true').lower() == 'true' else None
+
+# Per-method cache TTLs in seconds (LLM_CACHE_TTL_QUESTIONS / _SCORE / _FEEDBACK)
+llm_cache_ttls = {
+    method: float(os.getenv(f'LLM_CACHE_TTL_{method.upper()}'))
+    for method in ('questions', 'score', 'feedback')
+    if os.getenv(f'LLM_CACHE_TTL_{method.upper()}')
+}
+
+# Pre-generated question sets (opt-in: each refill is an extra LLM call)
+QUESTION_POOL = os.getenv('QUESTION_POOL', 'false').lower() == 'true'
+question_pool_presets = []
+if QUESTION_POOL and os.getenv('QUESTION_POOL_PRESETS'):
+    # JSON list of {"role", "job_description", "experience_level", "num_questions"}
+    try:
+        question_pool_presets = json.loads(os.getenv('QUESTION_POOL_PRESETS'))
+    except ValueError as e:
+        print(f"[WARNING] Ignoring invalid QUESTION_POOL_PRESETS: {str(e)}")
 
 # Initialize interview service with explicit API key
 from interview_service import InterviewService
-interview_service = InterviewService(api_key=api_key)
-
-# Initialize facial analysis service
+interview_service = InterviewService(
+    api_key=api_key,
+    cache=llm_cache,
+    cache_ttls=llm_cache_ttls,
+    client_options={
+        'base_url': os.getenv('GROQ_BASE_URL') or None,
+        'max_concurrency': int(os.getenv('LLM_MAX_CONCURRENCY', '8')),
+        'timeout': float(os.getenv('LLM_TIMEOUT', '30')),
+        'max_retries': int(os.getenv('LLM_MAX_RETRIES', '3'))
+    },
+    question_pool_options={
+        'size': int(os.getenv('QUESTION_POOL_SIZE', '3')),
+        'ttl': float(os.getenv('QUESTION_POOL_TTL', '3600')),
+        'max_keys': int(os.getenv('QUESTION_POOL_MAX_KEYS', '32')),
+        'workers': int(os.getenv('QUESTION_POOL_WORKERS', '2')),
+        'min_requests': int(os.getenv('QUESTION_POOL_MIN_REQUESTS', '2'))
+    } if QUESTION_POOL else None,
+    question_pool_presets=question_pool_presets,
+    feedback_prompt_tokens=int(os.getenv('FEEDBACK_PROMPT_TOKENS', '3000'))
+)
+
+# Per-client session state limits (face tracking, FaceMesh affinity, ...)
+SESSION_IDLE_TTL = float(os.getenv('SESSION_IDLE_TTL', '300'))
+MAX_SESSIONS = int(os.getenv('MAX_SESSIONS', '1000'))
+
+# Initialize facial analysis service (pool of FaceMesh graphs, one per core by default)
 from facial_analysis_service import FacialAnalysisService
-facial_analysis_service = FacialAnalysisService()
+facial_analysis_service = FacialAnalysisService(
+    pool_size=int(os.getenv('FACE_MESH_POOL_SIZE', '0')) or None,
+    max_sessions=MAX_SESSIONS,
+    session_idle_ttl=SESSION_IDLE_TTL,
+    session_history=int(os.getenv('FACIAL_SESSION_HISTORY', '32'))
+)
 
 # MEMORY OPTIMIZATION: Use lazy loading for model
 # Model will be loaded on first request instead of at startup
@@ -70,25 +131,46 @@ MODEL_FILE = 'Final_Resnet50_Best_model.keras'
 
 # Global variables for lazy loading
 model = None
-use_grayscale = False
-model_lock = False
-
-def download_model_if_needed():
-    """Download model from Hugging Face if not present"""
+model_descriptor = None
+
+# Batch sizes traced with a fixed input signature at load time
+from inference import CompiledPredictor, create_predictor, artifact_path
+from model_descriptor import EMOTION_LABELS, ModelDescriptor
+INFERENCE_BATCH_BUCKETS = [
+    int(b) for b in os.getenv('INFERENCE_BATCH_BUCKETS', '1,2,4,8,16,32').split(',') if b.strip()
+]
+
+# Inference backend: keras (default), tflite or onnx (see convert_models.py)
+INFERENCE_BACKEND = os.getenv('INFERENCE_BACKEND', 'keras').lower()
+INFERENCE_VARIANT = os.getenv('INFERENCE_VARIANT', 'int8')  # tflite only: int8 or fp16
+INFERENCE_THREADS = int(os.getenv('INFERENCE_THREADS', '0')) or None
+
+# Cross-request micro-batching (opt-in, useful with threaded workers)
+from inference_scheduler import InferenceScheduler
+INFERENCE_BATCHING = os.getenv('INFERENCE_BATCHING', 'false').lower() == 'true'
+INFERENCE_MAX_BATCH_SIZE = int(os.getenv('INFERENCE_MAX_BATCH_SIZE', '32'))
+INFERENCE_MAX_WAIT_MS = float(os.getenv('INFERENCE_MAX_WAIT_MS', '5'))
+inference_scheduler = None
+inference_scheduler_lock = threading.Lock()
+
+def download_model_if_needed(model_file=None, model_url=None, url_setting='MODEL_URL_RESNET'):
+    """Download a model from Hugging Face if not present (defaults to the ResNet50 model)"""
+    if model_file is None:
+        model_file, model_url = MODEL_FILE, MODEL_URL_RESNET
     project_root = os.path.join(os.path.dirname(__file__), '..')
-    model_path = os.path.join(project_root, MODEL_FILE)
+    model_path = os.path.join(project_root, model_file)
 
     if os.path.exists(model_path):
-        print(f"[INFO] Model {MODEL_FILE} found locally")
+        print(f"[INFO] Model {model_file} found locally")
         return model_path
 
-    if not MODEL_URL_RESNET:
-        raise Exception("MODEL_URL_RESNET environment variable not set!")
+    if not model_url:
+        raise Exception(f"{url_setting} environment variable not set!")
 
-    print(f"[INFO] Model {MODEL_FILE} not found locally, downloading from Hugging Face...")
+    print(f"[INFO] Model {model_file} not found locally, downloading from Hugging Face...")
 
     # Convert blob URLs to resolve URLs for direct download
-    download_url = MODEL_URL_RESNET
+    download_url = model_url
     if '/blob/' in download_url:
         download_url = download_url.replace('/blob/', '/resolve/')
         print(f"[INFO] Converted blob URL to resolve URL")
@@ -128,7 +210,7 @@ def download_model_if_needed():
             os.remove(model_path)
             raise Exception("Downloaded file is empty")
 
-        print(f"[SUCCESS] Downloaded {MODEL_FILE} ({file_size / (1024*1024):.1f} MB)")
+        print(f"[SUCCESS] Downloaded {model_file} ({file_size / (1024*1024):.1f} MB)")
         return model_path
 
     except Exception as e:
@@ -136,32 +218,43 @@ def download_model_if_needed():
             os.remove(model_path)
         raise Exception(f"Failed to download model: {str(e)}")
 
-def load_emotion_model():
-    """Lazy load the emotion detection model on first use"""
-    global model, use_grayscale, model_lock
+def load_model_file(model_file, model_url=None, url_setting='MODEL_URL_RESNET', backend=None):
+    """
+    Load one emotion model as a warmed-up predictor plus its input descriptor
 
-    if model is not None:
-        return model, use_grayscale
-
-    if model_lock:
-        # Another request is already loading the model
-        import time
-        for _ in range(60):  # Wait up to 60 seconds
-            time.sleep(1)
-            if model is not None:
-                return model, use_grayscale
-        raise Exception("Timeout waiting for model to load")
-
-    model_lock = True
+    Args:
+        model_file: Keras model file name in the project root
+        model_url: Download URL used when the file is missing
+        url_setting: Environment variable named in the error if no URL is configured
+        backend: Inference backend (defaults to INFERENCE_BACKEND)
 
+    Returns:
+        (predictor, ModelDescriptor)
+    """
+    backend = backend or INFERENCE_BACKEND
+    project_root = os.path.join(os.path.dirname(__file__), '..')
     try:
-        print("[INFO] Loading emotion detection model (ResNet50)...")
+        if backend != 'keras':
+            # Converted artifacts carry their own input shape - no Keras model needed
+            artifact = artifact_path(os.path.join(project_root, model_file), backend, INFERENCE_VARIANT)
+            print(f"[INFO] Loading emotion detection model ({backend}: {os.path.basename(artifact)})...")
+            loaded_predictor = create_predictor(
+                backend,
+                artifact,
+                num_threads=INFERENCE_THREADS,
+                batch_buckets=INFERENCE_BATCH_BUCKETS
+            )
+            descriptor = ModelDescriptor.from_model(loaded_predictor.input_shape, os.path.join(project_root, model_file))
+            print(f"[SUCCESS] Model loaded: {descriptor}")
+            return loaded_predictor, descriptor
+
+        print(f"[INFO] Loading emotion detection model ({model_file})...")
 
         # Download model if needed
-        model_path = download_model_if_needed()
+        model_path = download_model_if_needed(model_file, model_url, url_setting)
 
         # Load the model with compatibility settings
-        print(f"[INFO] Loading {MODEL_FILE}...")
+        print(f"[INFO] Loading {model_file}...")
         try:
             # Try loading with compile=False and safe_mode=False for better compatibility
             loaded_model = load_model(model_path, compile=False, safe_mode=False)
@@ -176,35 +269,137 @@ def load_emotion_model():
                 print(f"[ERROR] Failed to load model: {str(load_error2)}")
                 raise
 
-        # Test with RGB input (ResNet50 typically uses RGB)
-        print(f"[INFO] Testing model with RGB input...")
-        dummy_rgb = np.random.rand(1, 224, 224, 3).astype('float32')
-        try:
-            loaded_model.predict(dummy_rgb, verbose=0)
-            model = loaded_model
-            use_grayscale = False
-            print(f"[SUCCESS] Model loaded and tested with RGB input")
-        except Exception as rgb_error:
-            # Try grayscale if RGB fails
-            print(f"[INFO] RGB failed, testing with grayscale input...")
-            dummy_gray = np.random.rand(1, 224, 224, 1).astype('float32')
-            loaded_model.predict(dummy_gray, verbose=0)
-            model = loaded_model
-            use_grayscale = True
-            print(f"[SUCCESS] Model loaded and tested with grayscale input")
-
-        model_lock = False
-        return model, use_grayscale
+        # Input format comes from the model's input shape (and optional sidecar file),
+        # so no trial predictions are needed to find out RGB vs grayscale
+        descriptor = ModelDescriptor.from_model(loaded_model.input_shape, model_path)
+        print(f"[INFO] {descriptor}")
+
+        # Trace one fixed-signature inference function per batch bucket and warm them up
+        print(f"[INFO] Compiling inference function...")
+        loaded_predictor = CompiledPredictor(
+            loaded_model,
+            input_shape=descriptor.input_shape,
+            batch_buckets=INFERENCE_BATCH_BUCKETS
+        )
+        return loaded_predictor, descriptor
 
     except Exception as e:
-        model_lock = False
         raise Exception(f"Failed to load model: {str(e)}")
 
+def _load_emotion_model():
+    """Load the main (ResNet50) emotion model (run once by model_loader)"""
+    global model, model_descriptor
+    loaded_predictor, descriptor = load_model_file(MODEL_FILE, MODEL_URL_RESNET)
+    model_descriptor, model = descriptor, loaded_predictor
+    return model, model_descriptor
+
+# Once-only loader: concurrent first requests share one load instead of each
+# starting their own, and a failed load is retried with backoff
+from once_loader import OnceLoader
+MODEL_LOAD_WAIT_TIMEOUT = float(os.getenv('MODEL_LOAD_WAIT_TIMEOUT', '600'))
+MODEL_LOAD_RETRY_BASE = float(os.getenv('MODEL_LOAD_RETRY_BASE', '2'))
+MODEL_LOAD_RETRY_MAX = float(os.getenv('MODEL_LOAD_RETRY_MAX', '60'))
+model_loader = OnceLoader(
+    _load_emotion_model,
+    name='emotion model',
+    retry_base=MODEL_LOAD_RETRY_BASE,
+    retry_max=MODEL_LOAD_RETRY_MAX
+)
+
+def load_emotion_model():
+    """Lazy load the emotion detection model on first use; returns (model, descriptor)"""
+    if model is not None:
+        return model, model_descriptor
+    return model_loader.get(timeout=MODEL_LOAD_WAIT_TIMEOUT)
+
+def predict_batch(batch):
+    """Run a preprocessed face batch through the model, via the scheduler if enabled"""
+    global inference_scheduler
+
+    emotion_model, _ = load_emotion_model()
+
+    if not INFERENCE_BATCHING:
+        return emotion_model.predict(batch)
+
+    if inference_scheduler is None:
+        with inference_scheduler_lock:
+            if inference_scheduler is None:
+                scheduler = InferenceScheduler(
+                    predict_fn=emotion_model.predict,
+                    max_batch_size=min(INFERENCE_MAX_BATCH_SIZE, emotion_model.max_batch_size),
+                    max_wait_ms=INFERENCE_MAX_WAIT_MS
+                )
+                scheduler.start()
+                inference_scheduler = scheduler
+
+    return inference_scheduler.submit(batch)
+
+# Model registry: the ResNet50 above plus the small custom CNN, chosen per request by
+# a policy - one model by name, or "cascade" (custom CNN first, ResNet50 only for faces
+# it is not confident about)
+from model_registry import ModelRegistry
+CUSTOM_CNN_MODEL_FILE = os.getenv('CUSTOM_CNN_MODEL_FILE', 'Custom_CNN_model.keras')
+MODEL_URL_CUSTOM_CNN = os.getenv('MODEL_URL_CUSTOM_CNN')
+CASCADE_THRESHOLD = float(os.getenv('CASCADE_THRESHOLD', '0.6'))
+
+def _load_custom_cnn():
+    """Load the custom CNN, from a converted artifact when one exists for INFERENCE_BACKEND"""
+    project_root = os.path.join(os.path.dirname(__file__), '..')
+    artifact = artifact_path(os.path.join(project_root, CUSTOM_CNN_MODEL_FILE), INFERENCE_BACKEND, INFERENCE_VARIANT)
+    backend = INFERENCE_BACKEND if INFERENCE_BACKEND != 'keras' and os.path.exists(artifact) else 'keras'
+    return load_model_file(CUSTOM_CNN_MODEL_FILE, MODEL_URL_CUSTOM_CNN, 'MODEL_URL_CUSTOM_CNN', backend)
+
+model_registry = ModelRegistry(cascade_tiers=['custom_cnn', 'resnet50'], cascade_threshold=CASCADE_THRESHOLD)
+model_registry.register('resnet50', model_loader, predict_fn=predict_batch)
+model_registry.register('custom_cnn', OnceLoader(
+    _load_custom_cnn,
+    name='custom CNN',
+    retry_base=MODEL_LOAD_RETRY_BASE,
+    retry_max=MODEL_LOAD_RETRY_MAX
+))
+
+# Default policy per endpoint; clients may override it with X-Model-Policy / ?model_policy=
+DETECT_MODEL_POLICY = os.getenv('DETECT_MODEL_POLICY', 'resnet50')
+STREAM_MODEL_POLICY = os.getenv('STREAM_MODEL_POLICY', DETECT_MODEL_POLICY)
+for _policy in (DETECT_MODEL_POLICY, STREAM_MODEL_POLICY):
+    model_registry.resolve(_policy)
+
 # Load face detector
 face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
 
+# Per-session face tracking: search around last frame's faces, full scan every N frames
+from session_store import SessionStore
+from face_tracker import FaceTracker
+FACE_TRACKING = os.getenv('FACE_TRACKING', 'true').lower() == 'true'
+FACE_REDETECT_INTERVAL = int(os.getenv('FACE_REDETECT_INTERVAL', '10'))
+FACE_TRACK_PADDING = float(os.getenv('FACE_TRACK_PADDING', '0.5'))
+face_trackers = SessionStore(
+    lambda: FaceTracker(redetect_interval=FACE_REDETECT_INTERVAL, padding=FACE_TRACK_PADDING),
+    max_sessions=MAX_SESSIONS,
+    idle_ttl=SESSION_IDLE_TTL
+)
+
+# Per-session interview aggregates, updated on detections from sessions the client marks
+# as interviews (X-Interview: 1) so overall feedback only needs the session id; other
+# sessions (games, live streams) never create entries, so they cannot evict interviews
+from interview_session import InterviewSessionStats
+interview_sessions = SessionStore(InterviewSessionStats, max_sessions=MAX_SESSIONS, idle_ttl=SESSION_IDLE_TTL)
+
+def detect_faces(grayscale, min_size=30):
+    """Run the Haar cascade on a grayscale image"""
+    return face_cascade.detectMultiScale(
+        grayscale,
+        scaleFactor=1.3,
+        minNeighbors=5,
+        minSize=(min_size, min_size)
+    )
+
+# Faces are detected on a frame downscaled to this width, then cropped at full resolution
+from frame_pipeline import PreparedFrame
+DETECTION_MAX_WIDTH = int(os.getenv('DETECTION_MAX_WIDTH', '480'))
+
 # Emotion labels
-emotion_labels = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
+emotion_labels = EMOTION_LABELS
 
 # Emotion emoji mapping
 emotion_emojis = {
@@ -230,95 +425,146 @@ emotion_colors = {
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    """Health check endpoint"""
+    """Liveness check (readiness is reported by /api/ready)"""
     return jsonify({
         'status': 'healthy',
         'model_loaded': model is not None,
         'model_lazy_loading': True,
+        'inference_backend': INFERENCE_BACKEND,
+        'model_input': model_descriptor.to_dict() if model_descriptor else None,
+        'model_policies': model_registry.policies,
         'emotions': emotion_labels
     })
 
-@app.route('/api/detect', methods=['POST'])
-def detect_emotion():
-    """Detect emotions from base64 encoded image"""
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """
+    Readiness probe: 503 until the boot warm-up has finished (with WARMUP_ON_BOOT);
+    without warm-up the model loads on first request, so the instance is always ready
+    """
+    ready = warmup_done.is_set() if WARMUP_ON_BOOT else True
+    return jsonify({
+        'ready': ready,
+        'warmup_on_boot': WARMUP_ON_BOOT,
+        'model_loaded': model is not None,
+        'warmup': dict(warmup_state)
+    }), 200 if ready else 503
+
+# MediaPipe and the CNN are independent and both release the GIL, so they run in parallel
+from concurrent.futures import ThreadPoolExecutor
+DETECT_STAGE_WORKERS = int(os.getenv('DETECT_STAGE_WORKERS', '4'))
+stage_executor = ThreadPoolExecutor(
+    max_workers=DETECT_STAGE_WORKERS, thread_name_prefix='facial-analysis'
+) if DETECT_STAGE_WORKERS > 0 else None
+
+class StageTimings:
+    """Running per-stage latency totals for /api/metrics"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._totals = {}
+        self._counts = {}
+
+    def record(self, timings):
+        with self._lock:
+            for stage, ms in timings.items():
+                self._totals[stage] = self._totals.get(stage, 0.0) + ms
+                self._counts[stage] = self._counts.get(stage, 0) + 1
+
+    def averages(self):
+        with self._lock:
+            return {stage: round(self._totals[stage] / self._counts[stage], 2) for stage in self._totals}
+
+stage_timings = StageTimings()
+
+def run_facial_analysis(frame, prepared, session_id=None):
+    """MediaPipe stage; returns (facial_analysis, elapsed_ms) and never raises"""
+    started = time.perf_counter()
+    print("[INFO] Running facial analysis...")
     try:
-        # Lazy load model on first request
-        print("[INFO] Loading emotion model...")
-        emotion_model, is_grayscale = load_emotion_model()
-        print("[INFO] Model loaded successfully")
-
-        data = request.get_json()
-
-        if 'image' not in data:
-            return jsonify({'error': 'No image provided'}), 400
-
-        # Decode base64 image
-        image_data = data['image'].split(',')[1] if ',' in data['image'] else data['image']
-        image_bytes = base64.b64decode(image_data)
-        nparr = np.frombuffer(image_bytes, np.uint8)
-        frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
-
-        if frame is None:
-            return jsonify({'error': 'Invalid image data'}), 400
-
-        # Convert to grayscale for face detection
-        grayscale = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        # Perform facial analysis with MediaPipe
-        print("[INFO] Running facial analysis...")
-        try:
-            facial_analysis = facial_analysis_service.analyze_frame(frame)
-            print("[INFO] Facial analysis completed")
-        except Exception as fa_error:
-            print(f"[WARNING] Facial analysis failed: {str(fa_error)}")
-            # Continue without facial analysis
-            facial_analysis = {
-                'eye_contact': 0,
-                'confidence_score': 0,
-                'engagement_score': 0,
-                'head_pose': {'pitch': 0, 'yaw': 0, 'roll': 0}
-            }
-
-        # Detect faces
-        faces = face_cascade.detectMultiScale(
-            grayscale,
-            scaleFactor=1.3,
-            minNeighbors=5,
-            minSize=(30, 30)
+        facial_analysis = facial_analysis_service.analyze_frame(
+            frame, rgb_frame=prepared.small_rgb, session_id=session_id
         )
-
-        results = []
-
-        for (x, y, w, h) in faces:
-            # Extract face ROI
-            face_roi = frame[y:y+h, x:x+w]
-
-            # Prepare input based on model requirements
-            if is_grayscale:
-                # Grayscale input (1 channel)
-                face_gray = cv2.cvtColor(face_roi, cv2.COLOR_BGR2GRAY)
-                face = cv2.resize(face_gray, (224, 224))
-                face = face.astype("float32") / 255.0
-                face = np.expand_dims(face, axis=-1)  # Add channel dimension
-                face = np.expand_dims(face, axis=0)   # Add batch dimension
-            else:
-                # RGB input (3 channels)
-                face = cv2.resize(face_roi, (224, 224))
-                face = face.astype("float32") / 255.0
-                face = img_to_array(face)
-                face = np.expand_dims(face, axis=0)
-
-            # Predict emotion
-            prediction = emotion_model.predict(face, verbose=0)[0]
+        print("[INFO] Facial analysis completed")
+    except Exception as fa_error:
+        print(f"[WARNING] Facial analysis failed: {str(fa_error)}")
+        # Continue without facial analysis
+        facial_analysis = {
+            'eye_contact': 0,
+            'confidence_score': 0,
+            'engagement_score': 0,
+            'head_pose': {'pitch': 0, 'yaw': 0, 'roll': 0}
+        }
+    return facial_analysis, (time.perf_counter() - started) * 1000
+
+def detect_frame(frame, session_id=None, policy=None, interview=False):
+    """
+    Run face detection, facial analysis and emotion prediction on a decoded frame
+
+    Args:
+        frame: BGR image from OpenCV
+        session_id: Client session; enables face tracking across its frames
+        policy: Model policy (a model name or "cascade"; defaults to DETECT_MODEL_POLICY)
+        interview: Whether the session is an interview; only then are its detections aggregated
+
+    Returns:
+        Detection response dictionary (same schema for HTTP and WebSocket clients)
+    """
+    policy = policy or DETECT_MODEL_POLICY
+    started = time.perf_counter()
+    timings = {}
+
+    # Downscale once; detection and MediaPipe both work on the reduced frame
+    prepared = PreparedFrame(frame, DETECTION_MAX_WIDTH)
+    timings['preprocess'] = (time.perf_counter() - started) * 1000
+
+    # MediaPipe facial analysis runs alongside face detection + CNN inference
+    if stage_executor is not None:
+        facial_analysis_future = stage_executor.submit(run_facial_analysis, frame, prepared, session_id)
+    else:
+        facial_analysis_future = None
+        facial_analysis, timings['facial_analysis'] = run_facial_analysis(frame, prepared, session_id)
+
+    stage_started = time.perf_counter()
+    # Detect faces on the reduced frame (tracked sessions only search around their
+    # previous faces). The minimum is 30 px at full resolution, but the Haar cascade
+    # cannot see below its 24 px window, so on a frame reduced by more than 0.8x the
+    # effective full-resolution minimum is 24 / scale (e.g. 64 px for 1280 -> 480);
+    # DETECTION_MAX_WIDTH=0 keeps the full-resolution 30 px minimum
+    min_size = max(24, int(round(30 * prepared.scale)))
+    detect_fn = lambda gray: detect_faces(gray, min_size=min_size)
+    if session_id and FACE_TRACKING:
+        small_faces = face_trackers.get(session_id).detect(prepared.small_gray, detect_fn)
+    else:
+        small_faces = detect_fn(prepared.small_gray)
+
+    # Crop faces from the full-resolution frame
+    faces = prepared.to_full_resolution(small_faces)
+    timings['face_detection'] = (time.perf_counter() - stage_started) * 1000
+
+    predictions = []
+    if len(faces) > 0:
+        stage_started = time.perf_counter()
+
+        # Each model tier resizes its faces straight into one reusable float32 batch,
+        # so a frame costs one predict call per tier (rows keep the face order)
+        predictions = model_registry.classify(prepared, faces, policy, timeout=MODEL_LOAD_WAIT_TIMEOUT)
+        timings['emotion_inference'] = (time.perf_counter() - stage_started) * 1000
+
+    # Merge with the facial analysis stage
+    if facial_analysis_future is not None:
+        facial_analysis, timings['facial_analysis'] = facial_analysis_future.result()
+
+    results = []
+
+    if len(faces) > 0:
+        for (x, y, w, h), (prediction, descriptor, model_name) in zip(faces, predictions):
             emotion_idx = np.argmax(prediction)
-            emotion = emotion_labels[emotion_idx]
+            emotion = descriptor.labels[emotion_idx]
             confidence = float(prediction[emotion_idx])
 
             # Create probability distribution
-            probabilities = {
-                emotion_labels[i]: float(prediction[i])
-                for i in range(len(emotion_labels))
-            }
+            probabilities = descriptor.label_scores(prediction)
 
             results.append({
                 'bbox': {
@@ -332,16 +578,107 @@ def detect_emotion():
                 'probabilities': probabilities,
                 'emoji': emotion_emojis[emotion],
                 'color': emotion_colors[emotion],
+                'model': model_name,
                 # Add facial analysis data
                 'facial_analysis': facial_analysis
             })
 
-        return jsonify({
-            'success': True,
-            'faces_detected': len(results),
-            'results': results,
-            'facial_analysis': facial_analysis  # Also include at root level
-        })
+    # Interview aggregates follow the primary (first) face
+    if interview and session_id and results:
+        interview_sessions.get(session_id).add(results[0], facial_analysis)
+
+    timings['total'] = (time.perf_counter() - started) * 1000
+    timings = {stage: round(ms, 2) for stage, ms in timings.items()}
+    stage_timings.record(timings)
+
+    return {
+        'success': True,
+        'faces_detected': len(results),
+        'results': results,
+        'facial_analysis': facial_analysis,  # Also include at root level
+        'timings_ms': timings
+    }
+
+def get_session_id():
+    """Client session id from the X-Session-Id header, ?session_id= or the JSON body"""
+    session_id = request.headers.get('X-Session-Id') or request.args.get('session_id')
+    if not session_id and request.is_json:
+        session_id = (request.get_json(silent=True) or {}).get('session_id')
+    return str(session_id)[:128] if session_id else None
+
+def is_interview_request():
+    """Whether the client marks its session as an interview (X-Interview header or ?interview=)"""
+    marker = request.headers.get('X-Interview') or request.args.get('interview') or ''
+    return marker.lower() in ('1', 'true')
+
+def get_model_policy(default):
+    """
+    Model policy from the X-Model-Policy header or ?model_policy=, else the endpoint default
+
+    Raises:
+        ValueError: For an unknown policy
+    """
+    policy = request.headers.get('X-Model-Policy') or request.args.get('model_policy') or default
+    model_registry.resolve(policy)
+    return policy
+
+# Raw frame uploads accepted by /api/detect without base64/JSON framing
+BINARY_IMAGE_TYPES = {'image/jpeg', 'image/jpg', 'image/webp', 'image/png', 'application/octet-stream'}
+
+def read_image_buffer():
+    """
+    Get the uploaded image as a uint8 buffer (no copy for binary uploads)
+
+    Returns:
+        1-D uint8 array of encoded image bytes, or None if no image was sent
+    """
+    if request.mimetype in BINARY_IMAGE_TYPES:
+        # Decode straight from the request body bytes
+        body = request.get_data(cache=False)
+        return np.frombuffer(body, np.uint8) if body else None
+
+    if request.mimetype == 'multipart/form-data':
+        upload = request.files.get('image')
+        if upload is None:
+            return None
+        body = upload.read()
+        return np.frombuffer(body, np.uint8) if body else None
+
+    # Legacy JSON body with a base64 data URL
+    data = request.get_json(silent=True) or {}
+    if 'image' not in data:
+        return None
+    image_data = data['image'].split(',')[1] if ',' in data['image'] else data['image']
+    return np.frombuffer(base64.b64decode(image_data), np.uint8)
+
+@app.route('/api/detect', methods=['POST'])
+def detect_emotion():
+    """
+    Detect emotions from an uploaded frame
+
+    Accepts raw image bytes (Content-Type: image/jpeg, image/webp, image/png),
+    multipart/form-data with an "image" file, or JSON with a base64 "image"
+    """
+    try:
+        # Models load lazily inside the registry, and only the tiers this policy runs
+        try:
+            policy = get_model_policy(DETECT_MODEL_POLICY)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+
+        image_buffer = read_image_buffer()
+
+        if image_buffer is None:
+            return jsonify({'error': 'No image provided'}), 400
+
+        frame = cv2.imdecode(image_buffer, cv2.IMREAD_COLOR)
+
+        if frame is None:
+            return jsonify({'error': 'Invalid image data'}), 400
+
+        return jsonify(detect_frame(
+            frame, session_id=get_session_id(), policy=policy, interview=is_interview_request()
+        ))
 
     except Exception as e:
         import traceback
@@ -351,6 +688,98 @@ def detect_emotion():
         print(f"[ERROR] Traceback:\n{error_details}")
         return jsonify({'error': str(e), 'details': 'Check server logs for more information'}), 500
 
+from detection_stream import DetectionStream
+
+# Every open stream holds a server thread (plus its own worker thread) while connected, so
+# keep this below gunicorn's --threads to leave threads for the HTTP endpoints
+MAX_DETECT_STREAMS = int(os.getenv('MAX_DETECT_STREAMS', '4'))
+detect_stream_slots = threading.BoundedSemaphore(MAX_DETECT_STREAMS)
+active_detect_streams = 0
+active_detect_streams_lock = threading.Lock()
+
+@sock.route('/ws/detect')
+def detect_stream(ws):
+    """
+    Live detection over a WebSocket
+
+    Clients send binary frames (JPEG/WebP/PNG bytes) and receive one JSON result
+    per processed frame. Frames that arrive while the previous one is still being
+    processed replace each other, so only the newest frame is ever analyzed.
+    At most MAX_DETECT_STREAMS connections are served; extra ones get an error and are closed.
+    """
+    global active_detect_streams
+    if not detect_stream_slots.acquire(blocking=False):
+        print(f"[WARNING] Rejected detection stream: {MAX_DETECT_STREAMS} already open")
+        ws.send(json.dumps({
+            'type': 'error',
+            'success': False,
+            'error': 'Too many live detection streams, retry later or use /api/detect'
+        }))
+        return
+
+    with active_detect_streams_lock:
+        active_detect_streams += 1
+    try:
+        run_detect_stream(ws)
+    finally:
+        with active_detect_streams_lock:
+            active_detect_streams -= 1
+        detect_stream_slots.release()
+
+def run_detect_stream(ws):
+    """Serve one accepted detection stream until the client disconnects"""
+    # Each connection is one session unless the client names it
+    client_session_id = get_session_id()
+    session_id = client_session_id or f"ws-{uuid.uuid4().hex}"
+    # A generated id can never be passed to overall feedback, so only named sessions aggregate
+    interview = bool(client_session_id) and is_interview_request()
+    try:
+        policy = get_model_policy(STREAM_MODEL_POLICY)
+    except ValueError as e:
+        print(f"[WARNING] {str(e)}; using '{STREAM_MODEL_POLICY}'")
+        policy = STREAM_MODEL_POLICY
+
+    def process(frame_bytes):
+        frame = cv2.imdecode(np.frombuffer(frame_bytes, np.uint8), cv2.IMREAD_COLOR)
+        if frame is None:
+            return {'success': False, 'error': 'Invalid image data'}
+        return detect_frame(frame, session_id=session_id, policy=policy, interview=interview)
+
+    stream = DetectionStream(ws, process)
+    stream.run()
+    print(f"[INFO] Detection stream closed ({stream.frames_processed} processed, "
+          f"{stream.frames_dropped} dropped)")
+
+def get_face_tracking_stats():
+    """Aggregate full-frame vs tracked detections over live sessions"""
+    trackers = face_trackers.values()
+    full = sum(t.full_detections for t in trackers)
+    tracked = sum(t.tracked_detections for t in trackers)
+    return {
+        'enabled': FACE_TRACKING,
+        'active_sessions': len(trackers),
+        'full_detections': full,
+        'tracked_detections': tracked,
+        'tracked_ratio': tracked / (full + tracked) if full + tracked else 0.0
+    }
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Inference, detection and LLM cache metrics"""
+    return jsonify({
+        'model_loader': model_loader.get_stats(),
+        'model_registry': model_registry.get_stats(),
+        'inference_batching': INFERENCE_BATCHING,
+        'inference_scheduler': inference_scheduler.get_stats() if inference_scheduler else None,
+        'face_tracking': get_face_tracking_stats(),
+        'detect_streams': {'active': active_detect_streams, 'max': MAX_DETECT_STREAMS},
+        'avg_stage_timings_ms': stage_timings.averages(),
+        'face_mesh_pool': facial_analysis_service.get_stats(),
+        'llm_cache': llm_cache.get_stats() if llm_cache else None,
+        'llm_client': interview_service.client.get_stats() if interview_service.client else None,
+        'question_pool': interview_service.question_pool.get_stats() if interview_service.question_pool else None
+    })
+
 @app.route('/api/emotions', methods=['GET'])
 def get_emotions():
     """Get all available emotions with metadata"""
@@ -366,34 +795,50 @@ def get_emotions():
 
 # ==================== INTERVIEW ENDPOINTS ====================
 
+def sse_event(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload)}\n\n"
+
+def sse_response(events):
+    """Stream an iterator of SSE strings without proxy buffering"""
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def read_question_request(data):
+    """Validate a question generation request; returns (params, None) or (None, error response)"""
+    role = data.get('role')
+    job_description = data.get('job_description')
+
+    if not role:
+        return None, (jsonify({'error': 'Role is required'}), 400)
+
+    if not job_description:
+        return None, (jsonify({'error': 'Job description is required'}), 400)
+
+    return {
+        'role': role,
+        'job_description': job_description,
+        'experience_level': data.get('experience_level', 'mid'),
+        'num_questions': data.get('num_questions', 5)
+    }, None
+
 @app.route('/api/interview/generate-questions', methods=['POST'])
 def generate_questions():
     """Generate interview questions based on role and job description"""
     try:
-        data = request.get_json()
-
-        role = data.get('role')
-        job_description = data.get('job_description')
-        experience_level = data.get('experience_level', 'mid')
-        num_questions = data.get('num_questions', 5)
+        params, error = read_question_request(request.get_json())
+        if error:
+            return error
 
-        if not role:
-            return jsonify({'error': 'Role is required'}), 400
-
-        if not job_description:
-            return jsonify({'error': 'Job description is required'}), 400
-
-        questions = interview_service.generate_interview_questions(
-            role=role,
-            job_description=job_description,
-            experience_level=experience_level,
-            num_questions=num_questions
-        )
+        questions = interview_service.generate_interview_questions(**params)
 
         return jsonify({
             'success': True,
             'questions': questions,
-            'role': role,
+            'role': params['role'],
             'num_questions': len(questions)
         })
 
@@ -401,6 +846,41 @@ def generate_questions():
         print(f"[ERROR] {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/interview/generate-questions/stream', methods=['POST'])
+def generate_questions_stream():
+    """
+    Server-Sent Events variant of /api/interview/generate-questions
+    Emits a "question" event per question as soon as it is complete, then a "done"
+    event carrying the same payload as the non-streaming endpoint
+    """
+    params, error = read_question_request(request.get_json() or {})
+    if error:
+        return error
+
+    def events():
+        try:
+            stream = interview_service.stream_interview_questions(**params)
+            while True:
+                try:
+                    question = next(stream)
+                except StopIteration as finished:
+                    # The validated reply (or the fallback set), not the raw streamed questions
+                    questions = finished.value
+                    break
+                yield sse_event('question', question)
+
+            yield sse_event('done', {
+                'success': True,
+                'questions': questions,
+                'role': params['role'],
+                'num_questions': len(questions)
+            })
+        except Exception as e:
+            print(f"[ERROR] {str(e)}")
+            yield sse_event('error', {'error': str(e)})
+
+    return sse_response(events())
+
 @app.route('/api/interview/score-answer', methods=['POST'])
 def score_answer():
     """Score an interview answer"""
@@ -431,34 +911,164 @@ def score_answer():
         print(f"[ERROR] {str(e)}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/interview/overall-feedback', methods=['POST'])
-def overall_feedback():
-    """Generate overall interview feedback"""
+# Batch scoring: concurrent LLM calls per batch, or one packed prompt ("packed")
+SCORE_BATCH_CONCURRENCY = int(os.getenv('SCORE_BATCH_CONCURRENCY', '4'))
+SCORE_BATCH_STRATEGY = os.getenv('SCORE_BATCH_STRATEGY', 'parallel').lower()
+SCORE_BATCH_MAX_ANSWERS = int(os.getenv('SCORE_BATCH_MAX_ANSWERS', '20'))
+
+@app.route('/api/interview/score-answers', methods=['POST'])
+def score_answers():
+    """Score all of an interview's answers in one request"""
     try:
         data = request.get_json()
 
         role = data.get('role')
-        questions_and_scores = data.get('questions_and_scores', [])
-        emotion_data = data.get('emotion_data', {})
+        answers = data.get('answers', [])
 
-        if not role or not questions_and_scores:
-            return jsonify({'error': 'Role and questions_and_scores are required'}), 400
+        if not isinstance(answers, list) or not answers:
+            return jsonify({'error': 'answers must be a non-empty list'}), 400
+        if len(answers) > SCORE_BATCH_MAX_ANSWERS:
+            return jsonify({'error': f'At most {SCORE_BATCH_MAX_ANSWERS} answers per request'}), 400
+        if not all(isinstance(item, dict) and item.get('question') and item.get('answer') for item in answers):
+            return jsonify({'error': 'Every answer needs a question and an answer'}), 400
 
-        feedback = interview_service.generate_overall_feedback(
+        evaluations = interview_service.score_answers(
             role=role,
-            questions_and_scores=questions_and_scores,
-            emotion_data=emotion_data
+            answers=answers,
+            max_parallel=SCORE_BATCH_CONCURRENCY,
+            strategy=data.get('strategy', SCORE_BATCH_STRATEGY)
         )
 
         return jsonify({
             'success': True,
-            'feedback': feedback
+            'evaluations': evaluations
         })
 
     except Exception as e:
         print(f"[ERROR] {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def read_feedback_request(data):
+    """
+    Validate an overall feedback request; returns (params, None) or (None, error response)
+    With a session_id the emotion data comes from the server-side aggregates
+    """
+    role = data.get('role')
+    questions_and_scores = data.get('questions_and_scores', [])
+    session_id = data.get('session_id')
+
+    if not role or not questions_and_scores:
+        return None, (jsonify({'error': 'Role and questions_and_scores are required'}), 400)
+
+    if session_id:
+        # Use the server-side aggregates of the session's detections
+        stats = interview_sessions.peek(str(session_id)[:128])
+        if stats is None:
+            # No face was detected during the interview (or the session expired)
+            print(f"[WARNING] No detections recorded for interview session {session_id}")
+            stats = InterviewSessionStats()
+        emotion_data = stats.summary()
+    else:
+        emotion_data = data.get('emotion_data', {})
+
+    return {
+        'role': role,
+        'questions_and_scores': questions_and_scores,
+        'emotion_data': emotion_data
+    }, None
+
+@app.route('/api/interview/overall-feedback', methods=['POST'])
+def overall_feedback():
+    """Generate overall interview feedback"""
+    try:
+        params, error = read_feedback_request(request.get_json())
+        if error:
+            return error
+
+        feedback = interview_service.generate_overall_feedback(**params)
+
+        return jsonify({
+            'success': True,
+            'feedback': feedback,
+            'emotion_data': params['emotion_data']
+        })
+
+    except Exception as e:
+        print(f"[ERROR] {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/interview/overall-feedback/stream', methods=['POST'])
+def overall_feedback_stream():
+    """
+    Server-Sent Events variant of /api/interview/overall-feedback
+    Emits a "field" event ({"key", "value"}) per feedback field as soon as it is
+    complete, then a "done" event carrying the same payload as the non-streaming endpoint
+    """
+    params, error = read_feedback_request(request.get_json() or {})
+    if error:
+        return error
+
+    def events():
+        try:
+            stream = interview_service.stream_overall_feedback(**params)
+            while True:
+                try:
+                    key, value = next(stream)
+                except StopIteration as finished:
+                    # The validated reply (or the fallback), not the raw streamed fields
+                    feedback = finished.value
+                    break
+                yield sse_event('field', {'key': key, 'value': value})
+
+            yield sse_event('done', {
+                'success': True,
+                'feedback': feedback,
+                'emotion_data': params['emotion_data']
+            })
+        except Exception as e:
+            print(f"[ERROR] {str(e)}")
+            yield sse_event('error', {'error': str(e)})
+
+    return sse_response(events())
+
+# Optional boot warm-up: load the model, run one inference (starting the batching
+# scheduler if enabled) and start the MediaPipe graphs in the background so the
+# first request after a deploy is not cold; /api/ready reports when it finished
+WARMUP_ON_BOOT = os.getenv('WARMUP_ON_BOOT', 'false').lower() == 'true'
+warmup_done = threading.Event()
+warmup_state = {'attempts': 0, 'seconds': None, 'error': None}
+
+def warm_up():
+    """Warm up inference and facial analysis, retrying with backoff until it succeeds"""
+    started = time.perf_counter()
+    while True:
+        warmup_state['attempts'] += 1
+        try:
+            emotion_model, _ = load_emotion_model()
+            predict_batch(np.zeros((1,) + tuple(emotion_model.input_shape), dtype=np.float32))
+            facial_analysis_service.warm_up()
+            # Other models the endpoint defaults route to (e.g. the cascade's custom CNN);
+            # a missing optional model does not hold up readiness
+            model_registry.warm_up([
+                name for policy in {DETECT_MODEL_POLICY, STREAM_MODEL_POLICY}
+                for name in model_registry.resolve(policy) if name != 'resnet50'
+            ])
+            break
+        except Exception as e:
+            delay = min(MODEL_LOAD_RETRY_MAX, MODEL_LOAD_RETRY_BASE * (2 ** (warmup_state['attempts'] - 1)))
+            warmup_state['error'] = str(e)
+            print(f"[WARNING] Warm-up failed (attempt {warmup_state['attempts']}), retrying in {delay:.0f}s: {str(e)}")
+            time.sleep(delay)
+
+    warmup_state['error'] = None
+    warmup_state['seconds'] = round(time.perf_counter() - started, 3)
+    warmup_done.set()
+    print(f"[SUCCESS] Warm-up finished in {warmup_state['seconds']:.1f}s, ready for traffic")
+
+# Under the debug reloader only the serving child process warms up
+if WARMUP_ON_BOOT and (__name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true'):
+    threading.Thread(target=warm_up, name='warm-up', daemon=True).start()
+
 if __name__ == '__main__':
     print("[INFO] Starting Flask server...")
     app.run(host='0.0.0.0', port=5000, debug=True)
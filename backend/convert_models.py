@@ -0,0 +1,175 @@
+"""
+Convert the Keras emotion model to TFLite (int8 / float16) and ONNX
+Reports accuracy drift of every variant against the Keras model on a held-out image folder
+
+Usage:
+    python convert_models.py --eval-dir ../holdout_faces
+    python convert_models.py --formats tflite-fp16 onnx --tolerance 0.02
+
+The held-out folder may contain images directly, or one subfolder per emotion
+(Angry, Happy, ...) to also report accuracy against the true labels.
+"""
+
+import os
+import time
+import argparse
+import cv2
+import numpy as np
+import tensorflow as tf
+from pathlib import Path
+
+from frame_pipeline import PreparedFrame
+from inference import CompiledPredictor, TFLitePredictor, OnnxPredictor, artifact_path
+from model_descriptor import ModelDescriptor
+
+DEFAULT_MODEL = "Final_Resnet50_Best_model.keras"
+FORMATS = ("tflite-int8", "tflite-fp16", "onnx")
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".bmp", ".webp"}
+
+def convert_tflite(model, output_path, variant):
+    """Convert to TFLite with dynamic-range int8 or float16 weights"""
+    print(f"🔧 Converting to TFLite ({variant})...")
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]  # Dynamic-range int8 weights
+    if variant == "fp16":
+        converter.target_spec.supported_types = [tf.float16]
+
+    with open(output_path, "wb") as f:
+        f.write(converter.convert())
+
+    print(f"✅ Saved {Path(output_path).name}")
+
+def convert_onnx(model, output_path, input_shape):
+    """Export to ONNX with a dynamic batch dimension (requires tf2onnx)"""
+    print("🔧 Converting to ONNX...")
+
+    try:
+        import tf2onnx
+    except ImportError:
+        print("❌ tf2onnx is not installed. Run: pip install tf2onnx onnxruntime")
+        return False
+
+    signature = (tf.TensorSpec((None,) + tuple(input_shape), tf.float32, name="input"),)
+    tf2onnx.convert.from_keras(model, input_signature=signature, opset=13, output_path=output_path)
+
+    print(f"✅ Saved {Path(output_path).name}")
+    return True
+
+def load_eval_images(eval_dir, descriptor):
+    """Load held-out images and crop them exactly as /api/detect does (via the model's descriptor)"""
+    images, labels = [], []
+
+    for path in sorted(Path(eval_dir).rglob("*")):
+        if path.suffix.lower() not in IMAGE_EXTENSIONS:
+            continue
+
+        image = cv2.imread(str(path), cv2.IMREAD_COLOR)
+        if image is None:
+            continue
+
+        # The whole image is the face box; copy since crop_batch returns a reused buffer
+        prepared = PreparedFrame(image, detection_max_width=None)
+        height, width = image.shape[:2]
+        images.append(prepared.crop_batch([(0, 0, width, height)], **descriptor.crop_options)[0].copy())
+
+        # Optional ground truth from the parent folder name
+        label = path.parent.name.capitalize()
+        labels.append(descriptor.labels.index(label) if label in descriptor.labels else -1)
+
+    return np.stack(images) if images else np.empty((0,) + descriptor.input_shape, "float32"), np.array(labels)
+
+def evaluate(predictor, images, reference, labels):
+    """Compare a predictor's outputs with the Keras reference"""
+    start = time.perf_counter()
+    predictions = predictor.predict(images)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    agreement = float(np.mean(predictions.argmax(axis=1) == reference.argmax(axis=1)))
+    abs_diff = np.abs(predictions - reference)
+
+    report = {
+        "top1_agreement": agreement,
+        "mean_abs_diff": float(abs_diff.mean()),
+        "max_abs_diff": float(abs_diff.max()),
+        "ms_per_image": elapsed_ms / len(images),
+    }
+
+    labelled = labels >= 0
+    if labelled.any():
+        report["accuracy"] = float(np.mean(predictions[labelled].argmax(axis=1) == labels[labelled]))
+
+    return report
+
+def print_report(rows, tolerance):
+    """Print the drift table and recommend the smallest variant within tolerance"""
+    print("\n📊 Accuracy drift vs Keras model")
+    print(f"{'variant':<14}{'size MB':>9}{'agree':>8}{'mean|Δ|':>10}{'max|Δ|':>9}{'acc':>7}{'ms/img':>9}")
+    for name, size_mb, report in rows:
+        accuracy = f"{report['accuracy']:.3f}" if "accuracy" in report else "-"
+        print(f"{name:<14}{size_mb:>9.1f}{report['top1_agreement']:>8.3f}{report['mean_abs_diff']:>10.4f}"
+              f"{report['max_abs_diff']:>9.4f}{accuracy:>7}{report['ms_per_image']:>9.2f}")
+
+    within = [(size_mb, name) for name, size_mb, report in rows
+              if name != "keras" and 1.0 - report["top1_agreement"] <= tolerance]
+    if within:
+        size_mb, name = min(within)
+        print(f"\n🎉 Smallest variant within tolerance ({tolerance:.1%} top-1 disagreement): {name} ({size_mb:.1f} MB)")
+    else:
+        print(f"\n⚠️ No converted variant is within tolerance ({tolerance:.1%} top-1 disagreement)")
+
+def convert_models(model_path, formats, eval_dir=None, tolerance=0.01, num_threads=None):
+    """Convert the model to the requested formats and optionally report accuracy drift"""
+    print(f"📦 Loading {Path(model_path).name}...")
+    model = tf.keras.models.load_model(model_path, compile=False)
+    descriptor = ModelDescriptor.from_model(model.input_shape, model_path)
+    input_shape = descriptor.input_shape
+
+    artifacts = {}
+    for fmt in formats:
+        if fmt.startswith("tflite"):
+            variant = fmt.split("-")[1]
+            output_path = artifact_path(model_path, "tflite", variant)
+            convert_tflite(model, output_path, variant)
+            artifacts[fmt] = output_path
+        elif fmt == "onnx":
+            output_path = artifact_path(model_path, "onnx")
+            if convert_onnx(model, output_path, input_shape):
+                artifacts[fmt] = output_path
+
+    if not eval_dir:
+        return True
+
+    images, labels = load_eval_images(eval_dir, descriptor)
+    if len(images) == 0:
+        print(f"❌ No images found in {eval_dir}")
+        return False
+    print(f"\n🧪 Evaluating on {len(images)} held-out images...")
+
+    keras_predictor = CompiledPredictor(model, input_shape=input_shape, warmup=False)
+    reference = keras_predictor.predict(images)
+
+    rows = [("keras", os.path.getsize(model_path) / (1024 * 1024), evaluate(keras_predictor, images, reference, labels))]
+    for fmt, path in artifacts.items():
+        if fmt == "onnx":
+            predictor = OnnxPredictor(path, num_threads=num_threads, warmup=False)
+        else:
+            predictor = TFLitePredictor(path, num_threads=num_threads, warmup=False)
+        rows.append((fmt, os.path.getsize(path) / (1024 * 1024), evaluate(predictor, images, reference, labels)))
+
+    print_report(rows, tolerance)
+    return True
+
+if __name__ == "__main__":
+    # Check if running from backend directory (models live in the project root)
+    default_dir = ".." if os.path.exists("app.py") else "."
+
+    parser = argparse.ArgumentParser(description="Convert the emotion model to TFLite / ONNX")
+    parser.add_argument("--model", default=os.path.join(default_dir, DEFAULT_MODEL), help="Keras model to convert")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="Formats to export")
+    parser.add_argument("--eval-dir", help="Held-out image folder for the accuracy drift report")
+    parser.add_argument("--tolerance", type=float, default=0.01, help="Max top-1 disagreement with Keras (0-1)")
+    parser.add_argument("--threads", type=int, default=None, help="Threads for TFLite / ONNX Runtime")
+    args = parser.parse_args()
+
+    convert_models(args.model, args.formats, args.eval_dir, args.tolerance, args.threads)
@@ -0,0 +1,138 @@
+"""
+Detection Stream - Long-lived WebSocket channel for live emotion detection
+Keeps only the newest frame per connection so a slow server drops stale frames
+instead of building a queue of outdated ones
+"""
+
+import json
+import time
+import base64
+import binascii
+import threading
+from typing import Callable, Dict, Optional
+
+
+class DetectionStream:
+    """Latest-frame-wins pipeline for one WebSocket connection"""
+
+    def __init__(self, ws, process_fn: Callable[[bytes], Dict]):
+        """
+        Initialize the stream
+
+        Args:
+            ws: Connected WebSocket (flask-sock / simple-websocket)
+            process_fn: Function mapping encoded frame bytes to a detection result
+        """
+        self.ws = ws
+        self.process_fn = process_fn
+
+        self._cond = threading.Condition()
+        self._pending = None  # (frame_id, frame bytes) waiting to be processed
+        self._closed = False
+        self._send_lock = threading.Lock()  # Receive and worker threads both send
+
+        self.frames_received = 0
+        self.frames_processed = 0
+        self.frames_dropped = 0
+
+    def run(self):
+        """Receive frames until the client disconnects"""
+        worker = threading.Thread(target=self._process_loop, name='detection-stream', daemon=True)
+        worker.start()
+
+        try:
+            while True:
+                message = self.ws.receive()
+                if message is None:
+                    break
+                try:
+                    frame = self._parse_message(message)
+                except ValueError as e:
+                    # A bad message is answered, not fatal for the connection
+                    self._send({'type': 'error', 'success': False, 'error': str(e)})
+                    continue
+                if frame is not None:
+                    self._offer(frame)
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify()
+            worker.join(timeout=5)
+
+    def _parse_message(self, message) -> Optional[bytes]:
+        """
+        Binary messages are encoded frames; text messages may carry a base64 "image" or a ping
+
+        Raises:
+            ValueError: If the message is neither a frame nor a valid JSON object
+        """
+        if isinstance(message, (bytes, bytearray)):
+            return bytes(message)
+
+        try:
+            data = json.loads(message)
+        except ValueError:
+            raise ValueError('Expected a binary frame or JSON message')
+        if not isinstance(data, dict):
+            raise ValueError('Expected a JSON object')
+
+        if data.get('type') == 'ping':
+            self._send({'type': 'pong'})
+            return None
+
+        if 'image' in data:
+            image = data['image']
+            if not isinstance(image, str):
+                raise ValueError('"image" must be a base64 string')
+            try:
+                return base64.b64decode(image.split(",")[1] if "," in image else image)
+            except (binascii.Error, ValueError):
+                raise ValueError('Invalid base64 image data')
+
+        return None
+
+    def _offer(self, frame: bytes):
+        """Replace any frame that has not started processing yet"""
+        with self._cond:
+            self.frames_received += 1
+            if self._pending is not None:
+                self.frames_dropped += 1
+            self._pending = (self.frames_received, frame)
+            self._cond.notify()
+
+    def _process_loop(self):
+        """Process the newest frame whenever the previous one is done"""
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                frame_id, frame = self._pending
+                self._pending = None
+
+            started = time.perf_counter()
+            try:
+                result = self.process_fn(frame)
+            except Exception as e:
+                print(f"[ERROR] Stream detection failed: {str(e)}")
+                result = {'success': False, 'error': str(e)}
+
+            self.frames_processed += 1
+            result['frame_id'] = frame_id
+            result['frames_dropped'] = self.frames_dropped
+            result['processing_ms'] = round((time.perf_counter() - started) * 1000, 1)
+
+            if not self._send(result):
+                return
+
+    def _send(self, payload: Dict) -> bool:
+        try:
+            with self._send_lock:
+                self.ws.send(json.dumps(payload))
+            return True
+        except Exception:
+            # Client went away
+            with self._cond:
+                self._closed = True
+            return False
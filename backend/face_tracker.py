@@ -0,0 +1,99 @@
+"""
+Face Tracker - Reuses a session's previous face boxes to avoid full-frame Haar detection
+Only a padded region around each known face is searched; the full frame is scanned
+every N frames or whenever a tracked face is lost
+"""
+
+import threading
+import numpy as np
+from typing import Callable, List, Optional, Tuple
+
+Box = Tuple[int, int, int, int]
+
+
+def _iou(a: Box, b: Box) -> float:
+    """Intersection over union of two (x, y, w, h) boxes"""
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    intersection = ix * iy
+    union = aw * ah + bw * bh - intersection
+    return intersection / union if union > 0 else 0.0
+
+
+class FaceTracker:
+    """Per-session face box tracker"""
+
+    def __init__(self, redetect_interval: int = 10, padding: float = 0.5, min_iou: float = 0.3):
+        """
+        Initialize the tracker
+
+        Args:
+            redetect_interval: Force a full-frame detection at least every N frames
+            padding: Search margin around each previous box, as a fraction of its size
+            min_iou: Tracking is considered lost if a face moved/resized more than this allows
+        """
+        self.redetect_interval = max(1, int(redetect_interval))
+        self.padding = float(padding)
+        self.min_iou = float(min_iou)
+
+        self.boxes: Optional[List[Box]] = None
+        self.frames_since_full = 0
+        self.full_detections = 0
+        self.tracked_detections = 0
+
+        # A session's frames may arrive on different worker threads
+        self._lock = threading.Lock()
+
+    def detect(self, gray: np.ndarray, detect_fn: Callable[[np.ndarray], np.ndarray]) -> List[Box]:
+        """
+        Find faces, searching only around the previous boxes when possible
+
+        Args:
+            gray: Grayscale frame
+            detect_fn: Face detector returning (x, y, w, h) boxes for an image
+
+        Returns:
+            Face boxes in frame coordinates
+        """
+        with self._lock:
+            if self.boxes and self.frames_since_full < self.redetect_interval:
+                tracked = self._track(gray, detect_fn)
+                if tracked is not None:
+                    self.boxes = tracked
+                    self.frames_since_full += 1
+                    self.tracked_detections += 1
+                    return tracked
+
+            # Full-frame detection (first frame, periodic refresh or tracking lost)
+            boxes = [tuple(int(v) for v in box) for box in detect_fn(gray)]
+            self.boxes = boxes or None
+            self.frames_since_full = 0
+            self.full_detections += 1
+            return boxes
+
+    def _track(self, gray: np.ndarray, detect_fn: Callable[[np.ndarray], np.ndarray]) -> Optional[List[Box]]:
+        """Re-detect each known face inside its padded neighbourhood; None if any face is lost"""
+        frame_h, frame_w = gray.shape[:2]
+        tracked = []
+
+        for box in self.boxes:
+            x, y, w, h = box
+            pad_x, pad_y = int(w * self.padding), int(h * self.padding)
+            x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+            x1, y1 = min(frame_w, x + w + pad_x), min(frame_h, y + h + pad_y)
+
+            candidates = [
+                (int(cx) + x0, int(cy) + y0, int(cw), int(ch))
+                for (cx, cy, cw, ch) in detect_fn(gray[y0:y1, x0:x1])
+            ]
+            if not candidates:
+                return None
+
+            best = max(candidates, key=lambda c: _iou(c, box))
+            if _iou(best, box) < self.min_iou:
+                return None
+            tracked.append(best)
+
+        return tracked
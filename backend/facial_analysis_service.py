@@ -3,22 +3,60 @@ Facial Analysis Service using MediaPipe
 Provides detailed facial metrics: eye contact, head pose, confidence score, engagement
 """
 
+import os
+import threading
 import cv2
 import numpy as np
 import mediapipe as mp
-from typing import Dict, Tuple, Optional
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+from session_store import SessionStore
+from facial_session import FacialSessionState
+
+# Default upper bound for the graph pool: each refine-landmarks graph costs tens of MB
+DEFAULT_MAX_POOL_SIZE = 2
+
+
+def available_cpus() -> int:
+    """CPUs this process may run on (os.cpu_count() reports the host's, even in a container)"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
 
 class FacialAnalysisService:
     """Advanced facial analysis using MediaPipe Face Mesh"""
 
-    def __init__(self):
-        """Initialize MediaPipe Face Mesh"""
+    def __init__(self, pool_size: Optional[int] = None, max_sessions: int = 1000, session_idle_ttl: float = 300.0,
+                 session_history: int = 32):
+        """
+        Initialize a pool of MediaPipe Face Mesh graphs
+
+        Args:
+            pool_size: Maximum number of FaceMesh graphs, created on demand (defaults to
+                the usable CPUs, capped at DEFAULT_MAX_POOL_SIZE)
+            max_sessions: Maximum number of sessions with graph affinity and history
+            session_idle_ttl: Seconds before an idle session loses its graph affinity and history
+            session_history: Frames of landmarks and metrics kept per session
+        """
         self.mp_face_mesh = mp.solutions.face_mesh
-        self.face_mesh = self.mp_face_mesh.FaceMesh(
-            max_num_faces=1,
-            refine_landmarks=True,  # Includes iris landmarks
-            min_detection_confidence=0.5,
-            min_tracking_confidence=0.5
+
+        # A FaceMesh graph is not thread-safe, so each one is checked out by one
+        # thread at a time. Sessions stick to one graph so its tracking mode sees
+        # consecutive frames of the same face and can skip re-detection.
+        self.pool_size = max(1, int(pool_size or min(DEFAULT_MAX_POOL_SIZE, available_cpus())))
+        self.face_meshes = [None] * self.pool_size  # Created on first checkout
+        self._graph_locks = [threading.Lock() for _ in range(self.pool_size)]
+        self._graph_sessions = [0] * self.pool_size
+        self._assign_lock = threading.Lock()
+        self._next_graph = 0
+        self._session_graphs = SessionStore(
+            self._assign_graph,
+            max_sessions=max_sessions,
+            idle_ttl=session_idle_ttl,
+            on_evict=self._release_graph
         )
 
         # Key landmark indices
@@ -31,24 +69,122 @@ class FacialAnalysisService:
         self.LEFT_EYE_CORNER = 33
         self.RIGHT_EYE_CORNER = 263
 
-        print("[INFO] MediaPipe Face Mesh initialized successfully!")
+        # Index groups used by the vectorized metrics
+        self.EYE_CORNERS = [33, 133, 362, 263]          # left-outer, left-inner, right-inner, right-outer
+        self.HEAD_POSE_POINTS = [1, 152, 33, 263]       # nose, chin, left eye, right eye
+        self.EYE_LIDS = [159, 145, 386, 374]            # left top/bottom, right top/bottom
+        self.MOUTH_POINTS = [13, 14, 61, 291]           # upper lip, lower lip, left/right corner
+
+        # Only these landmarks are read from the protobuf (~40 of 478); reading
+        # every point costs more than the metrics themselves. Every index constant
+        # above is included so none of them reads an unfilled (zero) row.
+        self.USED_LANDMARKS = sorted(set(
+            self.LEFT_EYE + self.RIGHT_EYE + self.LEFT_IRIS + self.RIGHT_IRIS +
+            self.EYE_CORNERS + self.HEAD_POSE_POINTS + self.EYE_LIDS + self.MOUTH_POINTS +
+            [self.NOSE_TIP, self.CHIN, self.LEFT_EYE_CORNER, self.RIGHT_EYE_CORNER]
+        ))
+
+        # Per-session history for smoothed scores, motion-based stability and blink rate
+        self._session_states = SessionStore(
+            lambda: FacialSessionState(len(self.USED_LANDMARKS), history=session_history),
+            max_sessions=max_sessions,
+            idle_ttl=session_idle_ttl
+        )
+
+        print(f"[INFO] MediaPipe Face Mesh initialized successfully! (pool of up to {self.pool_size})")
+
+    def _create_face_mesh(self):
+        return self.mp_face_mesh.FaceMesh(
+            max_num_faces=1,
+            refine_landmarks=True,  # Includes iris landmarks
+            min_detection_confidence=0.5,
+            min_tracking_confidence=0.5
+        )
 
-    def analyze_frame(self, frame: np.ndarray) -> Dict:
+    def _assign_graph(self) -> int:
+        """Pin a new session to the graph serving the fewest sessions"""
+        with self._assign_lock:
+            index = min(range(self.pool_size), key=lambda i: self._graph_sessions[i])
+            self._graph_sessions[index] += 1
+            return index
+
+    def _release_graph(self, session_id: str, index: int):
+        with self._assign_lock:
+            self._graph_sessions[index] -= 1
+
+    @contextmanager
+    def _checkout(self, session_id: Optional[str] = None):
+        """Borrow a FaceMesh graph: the session's own graph, or any free one"""
+        if session_id:
+            index = self._session_graphs.get(session_id)
+            lock = self._graph_locks[index]
+            lock.acquire()
+        else:
+            with self._assign_lock:
+                start = self._next_graph
+                self._next_graph = (self._next_graph + 1) % self.pool_size
+            # Prefer graphs that already exist so idle graphs are only created under load
+            order = [(start + offset) % self.pool_size for offset in range(self.pool_size)]
+            for index in sorted(order, key=lambda i: self.face_meshes[i] is None):
+                lock = self._graph_locks[index]
+                if lock.acquire(blocking=False):
+                    break
+            else:
+                # Every graph is busy - wait for this request's turn on one of them
+                index = start
+                lock = self._graph_locks[index]
+                lock.acquire()
+        try:
+            if self.face_meshes[index] is None:
+                self.face_meshes[index] = self._create_face_mesh()
+            yield self.face_meshes[index]
+        finally:
+            lock.release()
+
+    def warm_up(self):
+        """Run every FaceMesh graph once so the first real frame does not pay for graph start-up"""
+        blank = np.zeros((240, 320, 3), dtype=np.uint8)
+        for index, lock in enumerate(self._graph_locks):
+            with lock:
+                if self.face_meshes[index] is None:
+                    self.face_meshes[index] = self._create_face_mesh()
+                self.face_meshes[index].process(blank)
+        print(f"[INFO] MediaPipe Face Mesh warmed up ({self.pool_size} graphs)")
+
+    def get_stats(self) -> Dict:
+        """Pool size, busy graphs, sessions pinned to each graph and sessions with history"""
+        with self._assign_lock:
+            sessions_per_graph = list(self._graph_sessions)
+        return {
+            'pool_size': self.pool_size,
+            'created_graphs': sum(face_mesh is not None for face_mesh in self.face_meshes),
+            'busy_graphs': sum(lock.locked() for lock in self._graph_locks),
+            'sessions_per_graph': sessions_per_graph,
+            'tracked_sessions': len(self._session_states)
+        }
+
+    def analyze_frame(self, frame: np.ndarray, rgb_frame: Optional[np.ndarray] = None,
+                      session_id: Optional[str] = None) -> Dict:
         """
         Analyze a single frame for detailed facial metrics
 
         Args:
             frame: BGR image from OpenCV
+            rgb_frame: Already converted (possibly downscaled) RGB version of the frame
+            session_id: Client session; its frames always go to the same FaceMesh graph,
+                and its scores are smoothed over its recent frames
 
         Returns:
             Dictionary with facial analysis metrics
         """
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        h, w = frame.shape[:2]
+        # Convert BGR to RGB unless the caller already has an RGB buffer
+        if rgb_frame is None:
+            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        h, w = rgb_frame.shape[:2]
 
         # Process with MediaPipe
-        results = self.face_mesh.process(rgb_frame)
+        with self._checkout(session_id) as face_mesh:
+            results = face_mesh.process(rgb_frame)
 
         if not results.multi_face_landmarks:
             return {
@@ -60,63 +196,82 @@ class FacialAnalysisService:
                 'metrics': {}
             }
 
-        landmarks = results.multi_face_landmarks[0]
+        # Read every landmark once; all metrics index into this array
+        points = self._landmarks_to_array(results.multi_face_landmarks[0], w, h)
 
         # Calculate all metrics
-        eye_contact = self._calculate_eye_contact(landmarks, w, h)
-        head_pose = self._calculate_head_pose(landmarks, w, h)
-        eye_openness = self._calculate_eye_openness(landmarks, w, h)
-        mouth_activity = self._calculate_mouth_activity(landmarks, w, h)
-        face_stability = self._calculate_face_stability(landmarks, w, h)
-
-        # Calculate overall scores
-        confidence_score = self._calculate_confidence_score(
-            eye_contact, head_pose, eye_openness, face_stability
-        )
+        eye_contact = self._calculate_eye_contact(points, w, h)
+        head_pose = self._calculate_head_pose(points, w, h)
+        eye_openness = self._calculate_eye_openness(points, w, h)
+        mouth_activity = self._calculate_mouth_activity(points, w, h)
+        face_stability = self._calculate_face_stability(points, w, h)
+
+        def score(face_stability: float) -> Dict[str, float]:
+            # Calculate overall scores
+            confidence_score = self._calculate_confidence_score(
+                eye_contact, head_pose, eye_openness, face_stability
+            )
+
+            engagement_score = self._calculate_engagement_score(
+                eye_contact, eye_openness, mouth_activity, face_stability
+            )
 
-        engagement_score = self._calculate_engagement_score(
-            eye_contact, eye_openness, mouth_activity, face_stability
-        )
+            return {
+                'eye_openness': eye_openness,
+                'mouth_activity': mouth_activity,
+                'face_stability': face_stability,
+                'eye_contact': eye_contact,
+                'confidence_score': confidence_score,
+                'engagement_score': engagement_score
+            }
+
+        # With a session, stability comes from how fast the landmarks move between frames
+        # and scores are exponentially smoothed instead of single-frame ones
+        state = self._session_states.get(session_id) if session_id else None
+        if state is not None:
+            eye_distance = float(np.linalg.norm(points[self.RIGHT_EYE_CORNER, :2] - points[self.LEFT_EYE_CORNER, :2]))
+            scores, session = state.update(points[self.USED_LANDMARKS], eye_distance, score, face_stability)
+        else:
+            scores, session = score(face_stability), None
 
+        metrics = {
+            'eye_openness': eye_openness,
+            'mouth_activity': mouth_activity,
+            'face_stability': scores['face_stability']
+        }
+        if session is not None:
+            metrics['blink_rate'] = session['blink_rate']
+
+        reported = session or scores
         return {
             'face_detected': True,
-            'eye_contact': eye_contact,
+            'eye_contact': reported['eye_contact'],
             'head_pose': head_pose,
-            'confidence_score': confidence_score,
-            'engagement_score': engagement_score,
-            'metrics': {
-                'eye_openness': eye_openness,
-                'mouth_activity': mouth_activity,
-                'face_stability': face_stability
-            }
+            'confidence_score': reported['confidence_score'],
+            'engagement_score': reported['engagement_score'],
+            'metrics': metrics
         }
 
-    def _calculate_eye_contact(self, landmarks, w: int, h: int) -> float:
+    def _calculate_eye_contact(self, points: np.ndarray, w: int, h: int) -> float:
         """
         Calculate eye contact percentage based on iris position
         Returns: 0.0 (no eye contact) to 1.0 (perfect eye contact)
         """
         try:
             # Get iris centers (more accurate than using first landmark)
-            left_iris_landmarks = [self._get_landmark_coords(landmarks, idx, w, h) for idx in self.LEFT_IRIS]
-            right_iris_landmarks = [self._get_landmark_coords(landmarks, idx, w, h) for idx in self.RIGHT_IRIS]
-
-            left_iris_x = sum(p[0] for p in left_iris_landmarks) / len(left_iris_landmarks)
-            right_iris_x = sum(p[0] for p in right_iris_landmarks) / len(right_iris_landmarks)
+            left_iris_x = points[self.LEFT_IRIS, 0].mean()
+            right_iris_x = points[self.RIGHT_IRIS, 0].mean()
 
-            # Get eye boundaries
-            left_eye_left = self._get_landmark_coords(landmarks, 33, w, h)
-            left_eye_right = self._get_landmark_coords(landmarks, 133, w, h)
-            right_eye_left = self._get_landmark_coords(landmarks, 362, w, h)
-            right_eye_right = self._get_landmark_coords(landmarks, 263, w, h)
+            # Get eye boundaries (left eye: 33-133, right eye: 362-263)
+            left_eye_left, left_eye_right, right_eye_left, right_eye_right = points[self.EYE_CORNERS, 0]
 
             # Calculate iris position relative to eye corners (0 = left, 1 = right)
-            left_eye_width = abs(left_eye_right[0] - left_eye_left[0])
-            right_eye_width = abs(right_eye_right[0] - right_eye_left[0])
+            left_eye_width = abs(left_eye_right - left_eye_left)
+            right_eye_width = abs(right_eye_right - right_eye_left)
 
             if left_eye_width > 0 and right_eye_width > 0:
-                left_iris_ratio = (left_iris_x - left_eye_left[0]) / left_eye_width
-                right_iris_ratio = (right_iris_x - right_eye_left[0]) / right_eye_width
+                left_iris_ratio = (left_iris_x - left_eye_left) / left_eye_width
+                right_iris_ratio = (right_iris_x - right_eye_left) / right_eye_width
 
                 # Clamp to valid range
                 left_iris_ratio = max(0.0, min(1.0, left_iris_ratio))
@@ -139,7 +294,7 @@ class FacialAnalysisService:
                 else:
                     eye_contact_score = max(0.3, 0.7 - (avg_center_distance - 0.25) * 2)
 
-                return round(eye_contact_score, 3)
+                return round(float(eye_contact_score), 3)
             else:
                 return 0.5
 
@@ -147,23 +302,18 @@ class FacialAnalysisService:
             print(f"[WARNING] Eye contact calculation error: {e}")
             return 0.5
 
-    def _calculate_head_pose(self, landmarks, w: int, h: int) -> Dict[str, float]:
+    def _calculate_head_pose(self, points: np.ndarray, w: int, h: int) -> Dict[str, float]:
         """
         Calculate head pose angles (pitch, yaw, roll)
         Pitch: up/down, Yaw: left/right, Roll: tilt
         """
         try:
             # Key points for head pose
-            nose = self._get_landmark_coords(landmarks, 1, w, h)
-            chin = self._get_landmark_coords(landmarks, 152, w, h)
-            left_eye = self._get_landmark_coords(landmarks, 33, w, h)
-            right_eye = self._get_landmark_coords(landmarks, 263, w, h)
-            left_mouth = self._get_landmark_coords(landmarks, 61, w, h)
-            right_mouth = self._get_landmark_coords(landmarks, 291, w, h)
+            nose, chin, left_eye, right_eye = points[self.HEAD_POSE_POINTS, :2]
 
             # Calculate angles
             # Yaw (left-right rotation)
-            eye_center = ((left_eye[0] + right_eye[0]) / 2, (left_eye[1] + right_eye[1]) / 2)
+            eye_center = (left_eye + right_eye) / 2
             yaw = (nose[0] - eye_center[0]) / w * 100  # Normalized
 
             # Pitch (up-down rotation)
@@ -175,34 +325,26 @@ class FacialAnalysisService:
             roll = np.degrees(eye_angle)
 
             return {
-                'pitch': round(pitch, 2),  # Positive = looking up
-                'yaw': round(yaw, 2),       # Positive = looking right
-                'roll': round(roll, 2)      # Positive = tilted right
+                'pitch': round(float(pitch), 2),  # Positive = looking up
+                'yaw': round(float(yaw), 2),       # Positive = looking right
+                'roll': round(float(roll), 2)      # Positive = tilted right
             }
 
         except Exception as e:
             print(f"[WARNING] Head pose calculation error: {e}")
             return {'pitch': 0, 'yaw': 0, 'roll': 0}
 
-    def _calculate_eye_openness(self, landmarks, w: int, h: int) -> float:
+    def _calculate_eye_openness(self, points: np.ndarray, w: int, h: int) -> float:
         """
         Calculate how open the eyes are (0.0 = closed, 1.0 = wide open)
         """
         try:
-            # Left eye vertical distance
-            left_top = self._get_landmark_coords(landmarks, 159, w, h)
-            left_bottom = self._get_landmark_coords(landmarks, 145, w, h)
-            left_height = abs(left_top[1] - left_bottom[1])
-
-            # Right eye vertical distance
-            right_top = self._get_landmark_coords(landmarks, 386, w, h)
-            right_bottom = self._get_landmark_coords(landmarks, 374, w, h)
-            right_height = abs(right_top[1] - right_bottom[1])
+            # Vertical lid distances for both eyes in one step (left: 159-145, right: 386-374)
+            lids = points[self.EYE_LIDS, 1]
+            left_height, right_height = np.abs(lids[0::2] - lids[1::2])
 
             # Eye horizontal distance (for normalization)
-            left_left = self._get_landmark_coords(landmarks, 33, w, h)
-            left_right = self._get_landmark_coords(landmarks, 133, w, h)
-            left_width = abs(left_right[0] - left_left[0])
+            left_width = abs(points[133, 0] - points[33, 0])
 
             # Calculate eye aspect ratio
             left_ear = left_height / left_width if left_width > 0 else 0
@@ -213,25 +355,20 @@ class FacialAnalysisService:
             # Normalize to 0-1 (typical EAR range: 0.15-0.35)
             openness = min(1.0, max(0.0, (avg_ear - 0.1) / 0.25))
 
-            return round(openness, 3)
+            return round(float(openness), 3)
 
         except Exception as e:
             print(f"[WARNING] Eye openness calculation error: {e}")
             return 0.7
 
-    def _calculate_mouth_activity(self, landmarks, w: int, h: int) -> float:
+    def _calculate_mouth_activity(self, points: np.ndarray, w: int, h: int) -> float:
         """
         Calculate mouth activity/animation (useful for detecting speaking)
         """
         try:
-            # Mouth vertical opening
-            upper_lip = self._get_landmark_coords(landmarks, 13, w, h)
-            lower_lip = self._get_landmark_coords(landmarks, 14, w, h)
+            # Mouth vertical opening (13-14) and width (61-291)
+            upper_lip, lower_lip, left_mouth, right_mouth = points[self.MOUTH_POINTS, :2]
             mouth_height = abs(upper_lip[1] - lower_lip[1])
-
-            # Mouth width
-            left_mouth = self._get_landmark_coords(landmarks, 61, w, h)
-            right_mouth = self._get_landmark_coords(landmarks, 291, w, h)
             mouth_width = abs(right_mouth[0] - left_mouth[0])
 
             # Calculate mouth aspect ratio
@@ -240,19 +377,19 @@ class FacialAnalysisService:
             # Normalize (typical MAR: 0.0-0.8)
             activity = min(1.0, mar / 0.8)
 
-            return round(activity, 3)
+            return round(float(activity), 3)
 
         except Exception as e:
             print(f"[WARNING] Mouth activity calculation error: {e}")
             return 0.3
 
-    def _calculate_face_stability(self, landmarks, w: int, h: int) -> float:
+    def _calculate_face_stability(self, points: np.ndarray, w: int, h: int) -> float:
         """
-        Calculate how stable the face is (less movement = more stable)
-        This would ideally track movement over time, but for now we check pose extremes
+        Calculate how stable the face is from a single frame (centered = more stable)
+        Used until a session has two frames; after that analyze_frame measures real movement
         """
         try:
-            nose = self._get_landmark_coords(landmarks, 1, w, h)
+            nose = points[self.NOSE_TIP]
 
             # Check if face is centered
             center_x = w / 2
@@ -264,7 +401,7 @@ class FacialAnalysisService:
             # Stability decreases with deviation from center
             stability = 1.0 - min(1.0, (x_deviation + y_deviation) / 2)
 
-            return round(stability, 3)
+            return round(float(stability), 3)
 
         except Exception as e:
             print(f"[WARNING] Face stability calculation error: {e}")
@@ -362,12 +499,23 @@ class FacialAnalysisService:
 
         return round(engagement, 3)
 
-    def _get_landmark_coords(self, landmarks, index: int, w: int, h: int) -> Tuple[float, float]:
-        """Get x, y coordinates of a landmark"""
-        landmark = landmarks.landmark[index]
-        return (landmark.x * w, landmark.y * h)
+    def _landmarks_to_array(self, landmarks, w: int, h: int) -> np.ndarray:
+        """
+        Convert the face mesh landmarks to one (N, 3) array of pixel coordinates
+
+        Rows keep their MediaPipe landmark index so metrics can fancy-index by id;
+        only the rows in USED_LANDMARKS are filled, the rest stay zero.
+        """
+        landmark = landmarks.landmark
+        points = np.zeros((len(landmark), 3), dtype=np.float64)
+        points[self.USED_LANDMARKS] = [
+            (landmark[i].x, landmark[i].y, landmark[i].z) for i in self.USED_LANDMARKS
+        ]
+        points *= (w, h, w)  # MediaPipe's z uses the same scale as x
+        return points
 
     def __del__(self):
         """Cleanup"""
-        if hasattr(self, 'face_mesh'):
-            self.face_mesh.close()
+        for face_mesh in getattr(self, 'face_meshes', []):
+            if face_mesh is not None:
+                face_mesh.close()
@@ -0,0 +1,147 @@
+"""
+Facial Session - Per-session memory for facial analysis
+Keeps a fixed-size ring buffer of recent landmarks so stability can be measured from
+real head movement, plus smoothed scores and blink timestamps
+"""
+
+import math
+import time
+import threading
+import numpy as np
+from collections import deque
+from typing import Callable, Dict, Optional, Tuple
+
+# Scores that are exponentially smoothed
+SMOOTHED_KEYS = ('eye_contact', 'confidence_score', 'engagement_score')
+
+
+class FacialSessionState:
+    """
+    Bounded, O(1)-per-frame history of one session's facial analysis
+
+    Each frame is added with update(), which measures motion, scores the frame and
+    smooths the scores under one lock so concurrent frames of a session cannot interleave.
+    """
+
+    def __init__(
+        self,
+        num_landmarks: int,
+        history: int = 32,
+        smoothing_seconds: float = 1.5,
+        max_speed: float = 1.0,
+        blink_window: float = 60.0
+    ):
+        """
+        Initialize the session state
+
+        Args:
+            num_landmarks: Landmarks stored per frame
+            history: Frames kept in the ring buffer
+            smoothing_seconds: Time constant of the exponential smoothing
+            max_speed: Movement (eye distances per second) at which stability reaches 0
+            blink_window: Seconds of blinks used for the blink rate
+        """
+        self.history = max(2, int(history))
+        self.smoothing_seconds = max(1e-3, float(smoothing_seconds))
+        self.max_speed = float(max_speed)
+        self.blink_window = float(blink_window)
+
+        self.landmarks = np.zeros((self.history, num_landmarks, 3), dtype=np.float64)
+        self.timestamps = np.zeros(self.history, dtype=np.float64)
+        self.frames = 0  # Total frames seen; the newest slot is (frames - 1) % history
+
+        self.smoothed: Dict[str, float] = {}
+        self.speed = None  # Smoothed landmark speed (eye distances per second)
+        self._dt = None  # Seconds between the last two frames
+
+        # Blink detection with hysteresis on eye openness
+        self.eyes_closed = False
+        self.blinks = deque(maxlen=256)  # Blink timestamps
+        self.started_at = None
+
+        self._lock = threading.Lock()
+
+    def update(
+        self,
+        landmarks: np.ndarray,
+        eye_distance: float,
+        score_fn: Callable[[float], Dict[str, float]],
+        default_stability: float,
+        now: Optional[float] = None
+    ) -> Tuple[Dict[str, float], Dict[str, float]]:
+        """
+        Add one frame: measure motion, score the frame and smooth its scores
+
+        Args:
+            landmarks: (num_landmarks, 3) pixel coordinates for this frame
+            eye_distance: Distance between the outer eye corners, used to normalize movement
+            score_fn: Maps the frame's face stability to its metric values (with 'eye_openness'
+                and the SMOOTHED_KEYS)
+            default_stability: Stability used until two frames were seen
+            now: Frame time in seconds (defaults to time.monotonic())
+
+        Returns:
+            (score_fn's metrics, dictionary with the smoothed scores and 'blink_rate' in blinks per minute)
+        """
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            stability = self._track_motion(landmarks, eye_distance, now)
+            metrics = score_fn(default_stability if stability is None else stability)
+
+            for key in SMOOTHED_KEYS:
+                value = float(metrics.get(key, 0.0))
+                if key in self.smoothed and self._dt and self._dt > 0:
+                    value = self._smooth(self.smoothed[key], value, self._dt)
+                self.smoothed[key] = value
+
+            self._track_blink(metrics.get('eye_openness', 1.0), now)
+
+            return metrics, {
+                **{key: round(value, 3) for key, value in self.smoothed.items()},
+                'blink_rate': self._blink_rate(now)
+            }
+
+    def _track_motion(self, landmarks: np.ndarray, eye_distance: float, now: float) -> Optional[float]:
+        """Store the landmarks and return 0.0 (moving at max_speed or faster) to 1.0 (still); None for the first frame"""
+        if self.started_at is None:
+            self.started_at = now
+
+        # Seconds since the previous frame (None for the first one)
+        previous = (self.frames - 1) % self.history
+        self._dt = now - float(self.timestamps[previous]) if self.frames else None
+
+        if self._dt and self._dt > 0 and eye_distance > 0:
+            displacement = np.linalg.norm(landmarks[:, :2] - self.landmarks[previous, :, :2], axis=1)
+            speed = float(displacement.mean()) / eye_distance / self._dt
+            self.speed = speed if self.speed is None else self._smooth(self.speed, speed, self._dt)
+
+        slot = self.frames % self.history
+        self.landmarks[slot] = landmarks
+        self.timestamps[slot] = now
+        self.frames += 1
+
+        if self.speed is None:
+            return None
+        return round(1.0 - min(1.0, self.speed / self.max_speed), 3)
+
+    def _smooth(self, previous: float, value: float, dt: float) -> float:
+        """Time-aware EMA: the same time constant whatever the client's frame rate"""
+        alpha = 1.0 - math.exp(-dt / self.smoothing_seconds)
+        return previous + alpha * (value - previous)
+
+    def _track_blink(self, eye_openness: float, now: float):
+        """Count a blink on each closed -> open transition"""
+        if not self.eyes_closed and eye_openness < 0.2:
+            self.eyes_closed = True
+        elif self.eyes_closed and eye_openness > 0.35:
+            self.eyes_closed = False
+            self.blinks.append(now)
+
+    def _blink_rate(self, now: float) -> float:
+        """Blinks per minute over the blink window (or the session so far, if shorter)"""
+        while self.blinks and now - self.blinks[0] > self.blink_window:
+            self.blinks.popleft()
+        # At least 10 s so one early blink does not read as a very high rate
+        window = min(self.blink_window, max(10.0, now - self.started_at))
+        return round(len(self.blinks) * 60.0 / window, 1)
@@ -0,0 +1,123 @@
+"""
+Frame Pipeline - Per-frame preprocessing shared by detection and analysis
+Faces are detected on a downscaled copy of the frame and cropped from full resolution.
+Every color conversion happens at most once per frame, and face crops are resized
+straight into a reusable float32 batch buffer and scaled in place.
+"""
+
+import threading
+import cv2
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+Box = Tuple[int, int, int, int]
+
+# Reusable per-thread buffers (batch input and uint8 resize scratch), one per
+# (name, row shape, dtype) so models with different input sizes keep their own
+_buffers = threading.local()
+
+
+def _thread_buffer(name: str, shape: Tuple[int, ...], dtype) -> np.ndarray:
+    """Return a per-thread buffer of at least shape[0] rows, growing it only when needed"""
+    cache = getattr(_buffers, 'cache', None)
+    if cache is None:
+        cache = _buffers.cache = {}
+    key = (name, tuple(shape[1:]), np.dtype(dtype))
+    buffer = cache.get(key)
+    if buffer is None or len(buffer) < shape[0]:
+        # Round the row count up to a power of two so growth is rare
+        rows = 1 << max(0, int(shape[0]) - 1).bit_length()
+        buffer = cache[key] = np.empty((rows,) + tuple(shape[1:]), dtype=dtype)
+    return buffer[:shape[0]]
+
+
+class PreparedFrame:
+    """A decoded frame plus the reduced-resolution buffers derived from it"""
+
+    def __init__(self, frame: np.ndarray, detection_max_width: Optional[int] = 480):
+        """
+        Downscale the frame once for detection
+
+        Args:
+            frame: Full-resolution BGR image from OpenCV
+            detection_max_width: Width faces are detected at (None/0 = full resolution)
+        """
+        self.frame = frame
+        self.height, self.width = frame.shape[:2]
+
+        if detection_max_width and self.width > detection_max_width:
+            self.scale = detection_max_width / self.width
+            small_size = (detection_max_width, max(1, round(self.height * self.scale)))
+            self.small = cv2.resize(frame, small_size, interpolation=cv2.INTER_AREA)
+        else:
+            self.scale = 1.0
+            self.small = frame
+
+        self.small_gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY)
+        self._small_rgb = None
+
+    @property
+    def small_rgb(self) -> np.ndarray:
+        """Downscaled RGB buffer (for MediaPipe), converted on first use"""
+        if self._small_rgb is None:
+            self._small_rgb = cv2.cvtColor(self.small, cv2.COLOR_BGR2RGB)
+        return self._small_rgb
+
+    def crop_batch(self, boxes: Sequence[Box], input_size: Tuple[int, int] = (224, 224),
+                   channels: int = 3, scale: float = 1.0 / 255.0, offset: float = 0.0,
+                   rgb: bool = False) -> np.ndarray:
+        """
+        Resize full-resolution face crops into a normalized float32 model batch
+        (pass a ModelDescriptor's crop_options to match a specific model)
+
+        Args:
+            boxes: Full-resolution (x, y, w, h) face boxes
+            input_size: Model input (width, height)
+            channels: 3 for color input, 1 for grayscale
+            scale: Pixel values are multiplied by this ([0, 1] by default)
+            offset: ...and then shifted by this
+            rgb: Feed color crops in RGB order instead of OpenCV's BGR
+
+        Returns:
+            View of shape (len(boxes), height, width, channels) into a reusable
+            per-thread buffer; valid until this thread prepares its next batch
+        """
+        width, height = input_size
+        batch = _thread_buffer('batch', (len(boxes), height, width, channels), np.float32)
+        scratch = _thread_buffer('scratch', (1, height, width, 3), np.uint8)[0]
+        converted = None
+        if channels == 1:
+            converted = _thread_buffer('gray_scratch', (1, height, width), np.uint8)[0]
+            conversion = cv2.COLOR_BGR2GRAY
+        elif rgb:
+            converted = _thread_buffer('rgb_scratch', (1, height, width, 3), np.uint8)[0]
+            conversion = cv2.COLOR_BGR2RGB
+
+        for i, (x, y, w, h) in enumerate(boxes):
+            # Crops are views into the frame; resize writes into the scratch buffer
+            cv2.resize(self.frame[y:y + h, x:x + w], (width, height), dst=scratch)
+            out = batch[i, :, :, 0] if channels == 1 else batch[i]
+            pixels = scratch
+            if converted is not None:
+                # Convert the model-sized crop rather than the whole frame
+                cv2.cvtColor(scratch, conversion, dst=converted)
+                pixels = converted
+            np.multiply(pixels, scale, out=out, casting='unsafe')
+            if offset:
+                out += offset
+
+        return batch
+
+    def to_full_resolution(self, boxes: Sequence[Sequence[int]]) -> List[Box]:
+        """Map (x, y, w, h) boxes from detection to full-resolution coordinates"""
+        if self.scale == 1.0:
+            return [tuple(int(v) for v in box) for box in boxes]
+
+        inv = 1.0 / self.scale
+        mapped = []
+        for x, y, w, h in boxes:
+            x0, y0 = int(round(x * inv)), int(round(y * inv))
+            x1 = min(self.width, int(round((x + w) * inv)))
+            y1 = min(self.height, int(round((y + h) * inv)))
+            mapped.append((x0, y0, x1 - x0, y1 - y0))
+        return mapped
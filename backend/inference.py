@@ -0,0 +1,279 @@
+"""
+Inference - Compiled, signature-fixed prediction for the emotion models
+Avoids the per-call data adapter and callback overhead of Keras model.predict,
+and optionally runs converted TFLite / ONNX artifacts instead of the Keras model
+"""
+
+import os
+import bisect
+import threading
+import numpy as np
+import tensorflow as tf
+from typing import Optional, Sequence, Tuple
+
+# Batch sizes that get their own traced graph; other sizes are padded up
+DEFAULT_BATCH_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+# Inference backends selectable with INFERENCE_BACKEND
+INFERENCE_BACKENDS = ('keras', 'tflite', 'onnx')
+
+
+class BucketedPredictor:
+    """Base class that pads every batch up to a fixed set of batch sizes"""
+
+    def __init__(self, input_shape: Sequence[int], batch_buckets: Sequence[int] = DEFAULT_BATCH_BUCKETS):
+        self.input_shape: Tuple[int, ...] = tuple(int(d) for d in input_shape)
+        self.batch_buckets = tuple(sorted(set(int(b) for b in batch_buckets if int(b) > 0)))
+        if not self.batch_buckets:
+            raise ValueError("At least one positive batch bucket is required")
+
+        # Padding buffers are per thread so concurrent requests never share one
+        self._local = threading.local()
+
+    @property
+    def max_batch_size(self) -> int:
+        return self.batch_buckets[-1]
+
+    def warmup(self):
+        """Run every batch bucket once on zeros"""
+        for bucket in self.batch_buckets:
+            self._run(np.zeros((bucket,) + self.input_shape, dtype=np.float32))
+        print(f"[INFO] Inference function warmed up for batch sizes {list(self.batch_buckets)}")
+
+    def predict(self, batch: np.ndarray) -> np.ndarray:
+        """
+        Predict a batch of preprocessed inputs
+
+        Args:
+            batch: Array of shape (N, *input_shape)
+
+        Returns:
+            Model output of shape (N, classes) as a NumPy array
+        """
+        batch = np.asarray(batch, dtype=np.float32)
+        count = len(batch)
+        if count == 0:
+            return np.empty((0, 0), dtype=np.float32)
+
+        if count > self.max_batch_size:
+            # Larger than the biggest bucket - run it in max-size chunks
+            return np.concatenate([
+                self.predict(batch[start:start + self.max_batch_size])
+                for start in range(0, count, self.max_batch_size)
+            ])
+
+        bucket = self.batch_buckets[bisect.bisect_left(self.batch_buckets, count)]
+        if bucket != count:
+            padded = self._padding_buffer(bucket)
+            padded[:count] = batch
+            padded[count:] = 0.0
+            batch = padded
+
+        return self._run(batch)[:count]
+
+    __call__ = predict
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """Run one bucket-sized batch through the backend"""
+        raise NotImplementedError
+
+    def _padding_buffer(self, bucket: int) -> np.ndarray:
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = self._local.buffers = {}
+        if bucket not in buffers:
+            buffers[bucket] = np.zeros((bucket,) + self.input_shape, dtype=np.float32)
+        return buffers[bucket]
+
+
+class CompiledPredictor(BucketedPredictor):
+    """Wraps a Keras model in one traced tf.function per batch bucket"""
+
+    def __init__(
+        self,
+        model,
+        input_shape: Optional[Sequence[int]] = None,
+        batch_buckets: Sequence[int] = DEFAULT_BATCH_BUCKETS,
+        warmup: bool = True
+    ):
+        """
+        Trace (and optionally warm up) the model for every batch bucket
+
+        Args:
+            model: Loaded Keras model
+            input_shape: Per-sample input shape, e.g. (224, 224, 3); defaults to model.input_shape
+            batch_buckets: Batch sizes to trace with a fixed input signature
+            warmup: Run each traced function once so the first request is not slow
+        """
+        super().__init__(input_shape or model.input_shape[1:], batch_buckets)
+        self.model = model
+
+        @tf.function(jit_compile=False)
+        def _forward(x):
+            return model(x, training=False)
+
+        self._functions = {
+            bucket: _forward.get_concrete_function(
+                tf.TensorSpec((bucket,) + self.input_shape, tf.float32)
+            )
+            for bucket in self.batch_buckets
+        }
+
+        if warmup:
+            self.warmup()
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self._functions[len(batch)](tf.convert_to_tensor(batch)).numpy()
+
+
+class TFLitePredictor(BucketedPredictor):
+    """Runs a converted .tflite model (float16 or dynamic-range int8)"""
+
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: Optional[int] = None,
+        batch_buckets: Sequence[int] = DEFAULT_BATCH_BUCKETS,
+        warmup: bool = True
+    ):
+        """
+        Load the TFLite interpreter
+
+        Args:
+            model_path: Path to the .tflite file
+            num_threads: Interpreter threads (defaults to all cores)
+            batch_buckets: Batch sizes the input tensor is resized to
+            warmup: Run each batch bucket once at load time
+        """
+        self.model_path = model_path
+        self._interpreter = tf.lite.Interpreter(
+            model_path=model_path,
+            num_threads=num_threads or os.cpu_count()
+        )
+        input_details = self._interpreter.get_input_details()[0]
+        self._input_index = input_details['index']
+        self._output_index = self._interpreter.get_output_details()[0]['index']
+        self._current_batch = None
+
+        # The interpreter is not thread-safe; concurrent requests take turns
+        self._lock = threading.Lock()
+
+        super().__init__(input_details['shape'][1:], batch_buckets)
+
+        if warmup:
+            self.warmup()
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if self._current_batch != len(batch):
+                self._interpreter.resize_tensor_input(self._input_index, batch.shape)
+                self._interpreter.allocate_tensors()
+                self._current_batch = len(batch)
+            self._interpreter.set_tensor(self._input_index, batch)
+            self._interpreter.invoke()
+            return self._interpreter.get_tensor(self._output_index).copy()
+
+
+class OnnxPredictor(BucketedPredictor):
+    """Runs an exported .onnx model with ONNX Runtime (optional dependency)"""
+
+    def __init__(
+        self,
+        model_path: str,
+        num_threads: Optional[int] = None,
+        batch_buckets: Sequence[int] = DEFAULT_BATCH_BUCKETS,
+        warmup: bool = True
+    ):
+        """
+        Create the ONNX Runtime session
+
+        Args:
+            model_path: Path to the .onnx file
+            num_threads: Intra-op threads (defaults to all cores)
+            batch_buckets: Batch sizes requests are padded to
+            warmup: Run each batch bucket once at load time
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError:
+            raise ImportError("onnxruntime is not installed. Run: pip install onnxruntime")
+
+        self.model_path = model_path
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads or os.cpu_count()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self._session = ort.InferenceSession(model_path, options, providers=['CPUExecutionProvider'])
+
+        model_input = self._session.get_inputs()[0]
+        self._input_name = model_input.name
+
+        super().__init__(model_input.shape[1:], batch_buckets)
+
+        if warmup:
+            self.warmup()
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self._session.run(None, {self._input_name: batch})[0]
+
+
+def create_predictor(
+    backend: str,
+    model_path: str,
+    num_threads: Optional[int] = None,
+    batch_buckets: Sequence[int] = DEFAULT_BATCH_BUCKETS,
+    keras_model=None,
+    input_shape: Optional[Sequence[int]] = None
+) -> BucketedPredictor:
+    """
+    Build the predictor for the selected inference backend
+
+    Args:
+        backend: One of "keras", "tflite", "onnx"
+        model_path: Model artifact for the backend (ignored for keras when keras_model is given)
+        num_threads: Threads for the TFLite / ONNX Runtime backends
+        batch_buckets: Batch sizes to trace / pad to
+        keras_model: Already loaded Keras model (keras backend only)
+        input_shape: Per-sample input shape override (keras backend only)
+
+    Returns:
+        Warmed-up predictor
+    """
+    backend = backend.lower()
+
+    if backend == 'keras':
+        if keras_model is None:
+            keras_model = tf.keras.models.load_model(model_path, compile=False)
+        return CompiledPredictor(keras_model, input_shape=input_shape, batch_buckets=batch_buckets)
+
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(
+            f"{model_path} not found. Create it with: python convert_models.py --formats {conversion_format(model_path, backend)}"
+        )
+
+    if backend == 'tflite':
+        return TFLitePredictor(model_path, num_threads=num_threads, batch_buckets=batch_buckets)
+    if backend == 'onnx':
+        return OnnxPredictor(model_path, num_threads=num_threads, batch_buckets=batch_buckets)
+
+    raise ValueError(f"Unknown inference backend '{backend}'. Choose from: {', '.join(INFERENCE_BACKENDS)}")
+
+
+def artifact_path(keras_path: str, backend: str, variant: Optional[str] = None) -> str:
+    """
+    Path of a converted model next to its Keras source
+
+    Example: Final_Resnet50_Best_model.keras -> Final_Resnet50_Best_model_int8.tflite
+    """
+    stem = os.path.splitext(keras_path)[0]
+    if backend == 'tflite':
+        return f"{stem}_{variant or 'int8'}.tflite"
+    if backend == 'onnx':
+        return f"{stem}.onnx"
+    return keras_path
+
+
+def conversion_format(model_path: str, backend: str) -> str:
+    """convert_models.py --formats choice that produces a backend's artifact"""
+    if backend == 'tflite':
+        return 'tflite-fp16' if model_path.endswith('_fp16.tflite') else 'tflite-int8'
+    return backend
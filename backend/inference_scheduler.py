@@ -0,0 +1,238 @@
+"""
+Inference Scheduler - Cross-request micro-batching for the emotion model
+Collects face tensors from concurrent requests and runs them as one batch
+"""
+
+import threading
+import time
+import queue
+import numpy as np
+from typing import Callable, Dict, List, Optional
+
+
+class _PendingRequest:
+    """A single request's face tensors waiting for a batch slot"""
+
+    __slots__ = ('inputs', 'done', 'result', 'error', 'enqueued_at', 'state')
+
+    def __init__(self, inputs: np.ndarray):
+        self.inputs = inputs
+        self.state = 'queued'   # -> 'running' once in a batch, or 'cancelled' by a timed-out caller
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.enqueued_at = time.perf_counter()
+
+
+class InferenceScheduler:
+    """Background worker that flushes queued face tensors as one model batch"""
+
+    def __init__(
+        self,
+        predict_fn: Callable[[np.ndarray], np.ndarray],
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0
+    ):
+        """
+        Initialize the scheduler
+
+        Args:
+            predict_fn: Function mapping an (N, H, W, C) batch to (N, classes) predictions
+            max_batch_size: Flush as soon as this many faces are queued
+            max_wait_ms: Flush at most this long after the first face was queued
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait = max(0.0, float(max_wait_ms)) / 1000.0
+
+        self._queue = queue.Queue()
+        self._claim_lock = threading.Lock()
+        self._carry = None  # Request that did not fit in the previous batch
+        self._buffer = None
+        self._thread = None
+        self._running = False
+
+        # Metrics
+        self._stats_lock = threading.Lock()
+        self._batch_size_histogram = {}
+        self._requests_per_batch_histogram = {}
+        self._batches_run = 0
+        self._faces_processed = 0
+        self._max_queue_depth = 0
+        self._total_wait_ms = 0.0
+        self._cancelled = 0
+
+    def start(self):
+        """Start the background inference thread"""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name='inference-scheduler', daemon=True)
+        self._thread.start()
+        print(f"[INFO] Inference scheduler started (max_batch_size={self.max_batch_size}, "
+              f"max_wait_ms={self.max_wait * 1000:.1f})")
+
+    def stop(self):
+        """Stop the background thread after the current batch"""
+        self._running = False
+        self._queue.put(None)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def submit(self, inputs: np.ndarray, timeout: Optional[float] = 30.0) -> np.ndarray:
+        """
+        Queue face tensors and block until their predictions are ready
+
+        Args:
+            inputs: Batch of preprocessed faces for one request (read in place, not copied)
+            timeout: Seconds to wait for the request to start running; once it is part of
+                a batch, submit waits for that batch so the inputs are never read afterwards
+
+        Returns:
+            Predictions for exactly the submitted faces, in the same order
+
+        Raises:
+            TimeoutError: If the request was still queued after timeout (it is then skipped)
+        """
+        if len(inputs) == 0:
+            return np.empty((0,), dtype='float32')
+
+        pending = _PendingRequest(inputs)
+        self._queue.put(pending)
+
+        depth = self._queue.qsize()
+        if depth > self._max_queue_depth:
+            with self._stats_lock:
+                self._max_queue_depth = max(self._max_queue_depth, depth)
+
+        if not pending.done.wait(timeout):
+            with self._claim_lock:
+                cancelled = pending.state == 'queued'
+                if cancelled:
+                    pending.state = 'cancelled'
+            if cancelled:
+                # The inputs usually live in this thread's reusable crop buffer; the batcher
+                # skips the request so it never reads them after the caller moved on
+                with self._stats_lock:
+                    self._cancelled += 1
+                raise TimeoutError("Timed out waiting for batched inference")
+            # Already part of a running batch that reads the inputs: let it finish
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.result
+
+    def get_stats(self) -> Dict:
+        """Return queue depth and batch-size histograms"""
+        with self._stats_lock:
+            return {
+                'running': self._running,
+                'max_batch_size': self.max_batch_size,
+                'max_wait_ms': self.max_wait * 1000,
+                'queue_depth': self._queue.qsize(),
+                'max_queue_depth': self._max_queue_depth,
+                'batches_run': self._batches_run,
+                'faces_processed': self._faces_processed,
+                'cancelled_requests': self._cancelled,
+                'avg_batch_size': (self._faces_processed / self._batches_run) if self._batches_run else 0.0,
+                'avg_queue_wait_ms': (self._total_wait_ms / self._batches_run) if self._batches_run else 0.0,
+                'batch_size_histogram': dict(sorted(self._batch_size_histogram.items())),
+                'requests_per_batch_histogram': dict(sorted(self._requests_per_batch_histogram.items()))
+            }
+
+    def _next_request(self, timeout: Optional[float]) -> Optional[_PendingRequest]:
+        """Take the carried-over request first, then read from the queue"""
+        if self._carry is not None:
+            pending, self._carry = self._carry, None
+            return pending
+        try:
+            return self._queue.get(timeout=timeout) if timeout is None or timeout > 0 else self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def _claim(self, pending: _PendingRequest) -> bool:
+        """Mark a request as running; False if its caller already gave up"""
+        with self._claim_lock:
+            if pending.state == 'cancelled':
+                return False
+            pending.state = 'running'
+            return True
+
+    def _collect_batch(self) -> List[_PendingRequest]:
+        """Block for the first request, then gather more until the batch is full or the deadline passes"""
+        first = self._next_request(timeout=None)
+        if first is None or not self._claim(first):
+            return []
+
+        batch = [first]
+        num_faces = len(first.inputs)
+        deadline = time.perf_counter() + self.max_wait
+
+        while num_faces < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            pending = self._next_request(timeout=remaining)
+            if pending is None:
+                break
+            if (num_faces + len(pending.inputs) > self.max_batch_size
+                    or pending.inputs.shape[1:] != first.inputs.shape[1:]):
+                # Does not fit (or needs a different input shape) - run it next time
+                self._carry = pending
+                break
+            if not self._claim(pending):
+                continue
+            batch.append(pending)
+            num_faces += len(pending.inputs)
+
+        return batch
+
+    def _stack(self, batch: List[_PendingRequest], num_faces: int) -> np.ndarray:
+        """Copy all request tensors into the reusable batch buffer"""
+        if len(batch) == 1:
+            return batch[0].inputs
+
+        sample_shape = batch[0].inputs.shape[1:]
+        if (self._buffer is None or self._buffer.shape[1:] != sample_shape
+                or len(self._buffer) < num_faces):
+            self._buffer = np.empty((max(self.max_batch_size, num_faces), *sample_shape), dtype='float32')
+
+        offset = 0
+        for pending in batch:
+            count = len(pending.inputs)
+            self._buffer[offset:offset + count] = pending.inputs
+            offset += count
+        return self._buffer[:num_faces]
+
+    def _run(self):
+        """Worker loop"""
+        while self._running:
+            batch = self._collect_batch()
+            if not batch:
+                continue
+
+            num_faces = sum(len(p.inputs) for p in batch)
+            started = time.perf_counter()
+
+            try:
+                predictions = np.asarray(self.predict_fn(self._stack(batch, num_faces)))
+
+                # Hand each request its own slice of the batch output
+                offset = 0
+                for pending in batch:
+                    count = len(pending.inputs)
+                    pending.result = predictions[offset:offset + count].copy()
+                    offset += count
+            except Exception as e:
+                print(f"[ERROR] Batched inference failed: {str(e)}")
+                for pending in batch:
+                    pending.error = e
+
+            for pending in batch:
+                pending.done.set()
+
+            with self._stats_lock:
+                self._batches_run += 1
+                self._faces_processed += num_faces
+                self._batch_size_histogram[num_faces] = self._batch_size_histogram.get(num_faces, 0) + 1
+                self._requests_per_batch_histogram[len(batch)] = \
+                    self._requests_per_batch_histogram.get(len(batch), 0) + 1
+                self._total_wait_ms += sum(started - p.enqueued_at for p in batch) / len(batch) * 1000
@@ -4,22 +4,80 @@ Uses Groq API with Llama-3.3-70b model
 """
 
 import os
-from groq import Groq
-from typing import List, Dict, Optional
+import concurrent.futures
+from typing import Any, Iterator, List, Dict, Optional, Tuple
 import json
 
+from llm_cache import LLMCache
+from llm_client import LLMClient
+from json_stream import JSONStreamParser
+from question_pool import QuestionPool
+from structured_output import (
+    EVALUATION_LIST_SCHEMA, EVALUATION_SCHEMA, FEEDBACK_SCHEMA, QUESTION_SET_SCHEMA,
+    StructuredOutputError, parse_structured, sized
+)
+
 class InterviewService:
     """Service for managing AI-powered interview functionality"""
 
-    def __init__(self, api_key: Optional[str] = None):
+    # Seconds a cached LLM response stays valid, per method
+    DEFAULT_CACHE_TTLS = {
+        'questions': 24 * 3600,     # Same role/description/level in a hiring drive
+        'score': 7 * 24 * 3600,     # Identical question + answer scores the same
+        'feedback': 3600
+    }
+
+    # Packed batch scoring: one prompt for several answers while it fits these limits
+    SCORE_MAX_TOKENS = 1500                 # Completion budget per answer
+    PACKED_MAX_OUTPUT_TOKENS = 8000
+    PACKED_MAX_PROMPT_TOKENS = 24000        # Estimated locally, see _estimate_tokens
+
+    # Overall feedback prompt: question texts are shortened (longest first) down to
+    # FEEDBACK_MIN_QUESTION_CHARS, then summarized per question type, to fit the budget
+    DEFAULT_FEEDBACK_PROMPT_TOKENS = 3000
+    FEEDBACK_MIN_QUESTION_CHARS = 60
+    CHARS_PER_TOKEN = 4
+
+    QUESTIONS_SYSTEM_PROMPT = "You are an expert interviewer who generates high-quality, role-specific interview questions. Always respond with valid JSON only."
+    FEEDBACK_SYSTEM_PROMPT = "You are an expert career coach who provides comprehensive, actionable interview feedback. Always respond with valid JSON only."
+    SCORE_SYSTEM_PROMPT = "You are an expert interview evaluator who provides fair, constructive feedback. Always respond with valid JSON only."
+
+    # A reply that fails validation gets one repair call with the problems listed
+    REPAIR_PROMPT = """Your previous reply could not be used: {errors}
+
+Reply again with ONLY the corrected JSON, in the format requested above, with no other text."""
+
+    EVALUATION_FORMAT = """{
+  "score": 0-100,
+  "feedback": "detailed feedback on the answer",
+  "strengths": ["strength 1", "strength 2"],
+  "improvements": ["improvement 1", "improvement 2"],
+  "key_points_covered": ["point 1", "point 2"],
+  "missing_points": ["missing point 1", "missing point 2"]
+}"""
+
+    def __init__(self, api_key: Optional[str] = None, cache: Optional[LLMCache] = None,
+                 cache_ttls: Optional[Dict[str, float]] = None, client_options: Optional[Dict] = None,
+                 question_pool_options: Optional[Dict] = None, question_pool_presets: Optional[List[Dict]] = None,
+                 feedback_prompt_tokens: Optional[int] = None):
         """
         Initialize the interview service with Groq API
 
         Args:
             api_key: Groq API key (optional, can be set via environment variable)
+            cache: Response cache shared by all LLM calls (None = no caching)
+            cache_ttls: Per-method TTL overrides ('questions', 'score', 'feedback')
+            client_options: LLMClient settings (base_url, max_concurrency, timeout, max_retries, ...)
+            question_pool_options: QuestionPool settings (size, ttl, max_keys, workers); None disables the pool
+            question_pool_presets: Question requests (role, job_description, experience_level,
+                num_questions) kept warm from startup
+            feedback_prompt_tokens: Input token budget for the overall feedback prompt
         """
         self.api_key = api_key or os.environ.get("GROQ_API_KEY")
         self.client = None
+        self.cache = cache
+        self.cache_ttls = {**self.DEFAULT_CACHE_TTLS, **(cache_ttls or {})}
+        self.feedback_prompt_tokens = int(feedback_prompt_tokens or self.DEFAULT_FEEDBACK_PROMPT_TOKENS)
 
         if not self.api_key:
             print("[WARNING] GROQ_API_KEY not set. Interview features will not work.")
@@ -31,7 +89,7 @@ class InterviewService:
                 masked = f"{self.api_key[:4]}...{self.api_key[-4:]}"
                 print(f"[INFO] Initializing Groq with API key: {masked}")
 
-                self.client = Groq(api_key=self.api_key)
+                self.client = LLMClient(api_key=self.api_key, **(client_options or {}))
                 print("[INFO] Groq client initialized successfully!")
             except Exception as e:
                 print(f"[ERROR] Failed to initialize Groq client: {str(e)}")
@@ -43,6 +101,19 @@ class InterviewService:
 
         self.model = "llama-3.3-70b-versatile"
 
+        # Replies are parsed, repaired and cached here rather than in the future's done
+        # callback, which runs on the LLM client's event loop and would stall other calls
+        self._reply_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix='llm-reply'
+        )
+
+        # Ready question sets for popular and recently requested roles
+        self.question_pool = None
+        if self.client and question_pool_options is not None:
+            self.question_pool = QuestionPool(self._generate_fresh_questions, **question_pool_options)
+            for preset in question_pool_presets or []:
+                self.question_pool.add_preset(**preset)
+
     def generate_interview_questions(
         self,
         role: str,
@@ -65,58 +136,23 @@ class InterviewService:
         if not self.client:
             raise ValueError("Groq API key not configured")
 
-        prompt = f"""You are an expert technical interviewer. Generate {num_questions} interview questions for the following position:
-
-Role: {role}
-Experience Level: {experience_level}
-Job Description: {job_description}
-
-Generate a mix of:
-1. Technical questions (specific to the role)
-2. Behavioral questions (using STAR method)
-3. Scenario-based questions
-4. Problem-solving questions
-
-Return ONLY a JSON array with this exact format:
-[
-  {{
-    "type": "technical|behavioral|scenario|problem-solving",
-    "question": "the question text",
-    "difficulty": "easy|medium|hard"
-  }}
-]
-
-Make questions challenging but appropriate for {experience_level} level. DO NOT include any text before or after the JSON array."""
+        pooled = self._take_pooled_questions(role, job_description, experience_level, num_questions)
+        if pooled is not None:
+            return pooled
 
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert interviewer who generates high-quality, role-specific interview questions. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
+            # With a pool, a miss must not hand every candidate the same cached set
+            questions = self._complete_json(
+                'questions',
+                schema=sized(QUESTION_SET_SCHEMA, num_questions),
+                system_prompt=self.QUESTIONS_SYSTEM_PROMPT,
+                prompt=self._questions_prompt(role, job_description, experience_level, num_questions),
                 temperature=0.7,
-                max_tokens=2000
+                max_tokens=2000,
+                use_cache=self.question_pool is None
             )
-
-            content = response.choices[0].message.content.strip()
-
-            # Remove markdown code blocks if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
-
-            questions = json.loads(content)
+            if self.question_pool is not None:
+                self.question_pool.record_served(role, job_description, experience_level, num_questions, questions)
             return questions
 
         except Exception as e:
@@ -146,7 +182,130 @@ Make questions challenging but appropriate for {experience_level} level. DO NOT
         if not self.client:
             raise ValueError("Groq API key not configured")
 
-        prompt = f"""You are an expert interview evaluator. Evaluate this interview response:
+        try:
+            evaluation = self._complete_json(
+                'score',
+                schema=EVALUATION_SCHEMA,
+                system_prompt=self.SCORE_SYSTEM_PROMPT,
+                prompt=self._score_prompt(question, answer, question_type, role),
+                temperature=0.3,  # Lower temperature for more consistent scoring
+                max_tokens=self.SCORE_MAX_TOKENS
+            )
+            return evaluation
+
+        except Exception as e:
+            print(f"[ERROR] Failed to score answer: {str(e)}")
+            return self._fallback_evaluation()
+
+    def score_answers(
+        self,
+        role: str,
+        answers: List[Dict],
+        max_parallel: int = 4,
+        strategy: str = "parallel"
+    ) -> List[Dict[str, any]]:
+        """
+        Score several interview answers at once
+
+        Args:
+            role: Job role
+            answers: List of dictionaries with question, answer and question_type
+            max_parallel: Maximum concurrent LLM calls for this batch
+            strategy: "parallel" (one call per answer, run concurrently) or "packed"
+                (one call for all answers when they fit, otherwise parallel)
+
+        Returns:
+            One evaluation per answer, in the same order
+        """
+        if not self.client:
+            raise ValueError("Groq API key not configured")
+        if not answers:
+            return []
+
+        if strategy == "packed" and len(answers) > 1:
+            evaluations = self._score_packed(role, answers)
+            if evaluations is not None:
+                return evaluations
+
+        return self._score_parallel(role, answers, max_parallel)
+
+    def _score_parallel(self, role: str, answers: List[Dict], max_parallel: int) -> List[Dict]:
+        """One scoring call per answer, at most max_parallel in flight"""
+        evaluations = [None] * len(answers)
+        queue = iter(enumerate(answers))
+        pending = {}
+
+        def start_next():
+            for index, item in queue:
+                future = self._start_json(
+                    'score',
+                    schema=EVALUATION_SCHEMA,
+                    system_prompt=self.SCORE_SYSTEM_PROMPT,
+                    prompt=self._score_prompt(
+                        item.get('question', ''), item.get('answer', ''),
+                        item.get('question_type', 'general'), role
+                    ),
+                    temperature=0.3,
+                    max_tokens=self.SCORE_MAX_TOKENS
+                )
+                pending[future] = index
+                return
+
+        for _ in range(max(1, int(max_parallel))):
+            start_next()
+
+        while pending:
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    evaluations[index] = future.result()
+                except Exception as e:
+                    print(f"[ERROR] Failed to score answer {index + 1}: {str(e)}")
+                    evaluations[index] = self._fallback_evaluation()
+                start_next()
+
+        return evaluations
+
+    def _score_packed(self, role: str, answers: List[Dict]) -> Optional[List[Dict]]:
+        """All answers in one structured prompt; None if they do not fit or the reply is unusable"""
+        max_tokens = self.SCORE_MAX_TOKENS * len(answers)
+
+        sections = "\n\n".join(
+            f"""Response {i}:
+Question: {item.get('question', '')}
+Question Type: {item.get('question_type', 'general')}
+Candidate's Answer: {item.get('answer', '')}"""
+            for i, item in enumerate(answers, 1)
+        )
+
+        prompt = f"""You are an expert interview evaluator. Evaluate each of these {len(answers)} interview responses for the role of {role}:
+
+{sections}
+
+Return ONLY a JSON array with exactly {len(answers)} evaluations, in the same order as the responses, each in this format:
+{self.EVALUATION_FORMAT}
+
+Be constructive, specific, and fair. Return ONLY the JSON array."""
+
+        if max_tokens > self.PACKED_MAX_OUTPUT_TOKENS or self._estimate_tokens(prompt) > self.PACKED_MAX_PROMPT_TOKENS:
+            return None
+
+        try:
+            return self._complete_json(
+                'score',
+                schema=sized(EVALUATION_LIST_SCHEMA, len(answers), len(answers)),
+                system_prompt=self.SCORE_SYSTEM_PROMPT,
+                prompt=prompt,
+                temperature=0.3,
+                max_tokens=max_tokens
+            )
+        except Exception as e:
+            print(f"[WARNING] Packed scoring failed, scoring answers separately: {str(e)}")
+            return None
+
+    def _score_prompt(self, question: str, answer: str, question_type: str, role: str) -> str:
+        return f"""You are an expert interview evaluator. Evaluate this interview response:
 
 Question: {question}
 Question Type: {question_type}
@@ -154,67 +313,124 @@ Role: {role}
 Candidate's Answer: {answer}
 
 Provide a detailed evaluation in JSON format:
-{{
-  "score": 0-100,
-  "feedback": "detailed feedback on the answer",
-  "strengths": ["strength 1", "strength 2"],
-  "improvements": ["improvement 1", "improvement 2"],
-  "key_points_covered": ["point 1", "point 2"],
-  "missing_points": ["missing point 1", "missing point 2"]
-}}
+{self.EVALUATION_FORMAT}
 
 Be constructive, specific, and fair. Return ONLY the JSON object."""
 
+    def _fallback_evaluation(self) -> Dict[str, any]:
+        return {
+            "score": 50,
+            "feedback": "Unable to evaluate answer at this time.",
+            "strengths": [],
+            "improvements": [],
+            "key_points_covered": [],
+            "missing_points": []
+        }
+
+    def generate_overall_feedback(
+        self,
+        role: str,
+        questions_and_scores: List[Dict],
+        emotion_data: Dict
+    ) -> Dict[str, any]:
+        """
+        Generate overall interview feedback
+
+        Args:
+            role: Job role
+            questions_and_scores: List of questions with scores and answers
+            emotion_data: Aggregated emotion data from the interview
+
+        Returns:
+            Overall feedback and recommendations
+        """
+        if not self.client:
+            raise ValueError("Groq API key not configured")
+
+        avg_score = sum(q.get('score', 0) for q in questions_and_scores) / len(questions_and_scores)
+
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert interview evaluator who provides fair, constructive feedback. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.3,  # Lower temperature for more consistent scoring
-                max_tokens=1500
+            feedback = self._complete_json(
+                'feedback',
+                schema=FEEDBACK_SCHEMA,
+                system_prompt=self.FEEDBACK_SYSTEM_PROMPT,
+                prompt=self._feedback_prompt(role, questions_and_scores, emotion_data, avg_score),
+                temperature=0.4,
+                max_tokens=2000
             )
+            return feedback
 
-            content = response.choices[0].message.content.strip()
+        except Exception as e:
+            print(f"[ERROR] Failed to generate overall feedback: {str(e)}")
+            return self._fallback_feedback(avg_score)
 
-            # Clean up markdown if present
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+    def stream_interview_questions(
+        self,
+        role: str,
+        job_description: str,
+        experience_level: str = "mid",
+        num_questions: int = 5
+    ) -> Iterator[Dict[str, str]]:
+        """
+        Streaming generate_interview_questions: yields each question as soon as it is complete
 
-            evaluation = json.loads(content)
-            return evaluation
+        Args:
+            role: Job title/role
+            job_description: Detailed job description
+            experience_level: One of "entry", "mid", "senior"
+            num_questions: Number of questions to generate
+
+        Returns:
+            Iterator over question dictionaries (fallback questions fill in on failure);
+            its return value is the final question set, identical to generate_interview_questions'
+            (the validated reply, or the whole fallback set if the reply was unusable)
+        """
+        if not self.client:
+            raise ValueError("Groq API key not configured")
+
+        pooled = self._take_pooled_questions(role, job_description, experience_level, num_questions)
+        if pooled is not None:
+            yield from pooled
+            return pooled
+
+        sent = 0
+        try:
+            stream = self._stream_json(
+                'questions',
+                schema=sized(QUESTION_SET_SCHEMA, num_questions),
+                system_prompt=self.QUESTIONS_SYSTEM_PROMPT,
+                prompt=self._questions_prompt(role, job_description, experience_level, num_questions),
+                temperature=0.7,
+                max_tokens=2000,
+                use_cache=self.question_pool is None
+            )
+            while True:
+                try:
+                    question = next(stream)
+                except StopIteration as finished:
+                    questions = finished.value
+                    break
+                sent += 1
+                yield question
+
+            if self.question_pool is not None:
+                self.question_pool.record_served(role, job_description, experience_level, num_questions, questions)
+            return questions
 
         except Exception as e:
-            print(f"[ERROR] Failed to score answer: {str(e)}")
-            return {
-                "score": 50,
-                "feedback": "Unable to evaluate answer at this time.",
-                "strengths": [],
-                "improvements": [],
-                "key_points_covered": [],
-                "missing_points": []
-            }
+            print(f"[ERROR] Failed to stream questions: {str(e)}")
+            questions = self._get_fallback_questions(role, num_questions)
+            yield from questions[sent:]
+            return questions
 
-    def generate_overall_feedback(
+    def stream_overall_feedback(
         self,
         role: str,
         questions_and_scores: List[Dict],
         emotion_data: Dict
-    ) -> Dict[str, any]:
+    ) -> Iterator[Tuple[str, Any]]:
         """
-        Generate overall interview feedback
+        Streaming generate_overall_feedback: yields each feedback field as soon as it is complete
 
         Args:
             role: Job role
@@ -222,21 +438,97 @@ Be constructive, specific, and fair. Return ONLY the JSON object."""
             emotion_data: Aggregated emotion data from the interview
 
         Returns:
-            Overall feedback and recommendations
+            Iterator over (field, value) pairs (fallback values fill in missing fields on failure);
+            its return value is the final feedback, identical to generate_overall_feedback's
+            (the validated reply, or the whole fallback if the reply was unusable)
         """
         if not self.client:
             raise ValueError("Groq API key not configured")
 
         avg_score = sum(q.get('score', 0) for q in questions_and_scores) / len(questions_and_scores)
 
-        prompt = f"""You are an expert career coach. Provide overall interview feedback:
+        sent = set()
+        try:
+            stream = self._stream_json(
+                'feedback',
+                schema=FEEDBACK_SCHEMA,
+                system_prompt=self.FEEDBACK_SYSTEM_PROMPT,
+                prompt=self._feedback_prompt(role, questions_and_scores, emotion_data, avg_score),
+                temperature=0.4,
+                max_tokens=2000
+            )
+            while True:
+                try:
+                    field, value = next(stream)
+                except StopIteration as finished:
+                    return finished.value
+                sent.add(field)
+                yield field, value
+
+        except Exception as e:
+            print(f"[ERROR] Failed to stream overall feedback: {str(e)}")
+            feedback = self._fallback_feedback(avg_score)
+            for field, value in feedback.items():
+                if field not in sent:
+                    yield field, value
+            return feedback
+
+    def _take_pooled_questions(self, role: str, job_description: str, experience_level: str,
+                               num_questions: int) -> Optional[List[Dict[str, str]]]:
+        """A ready set from the question pool, or None (the pool then refills in the background)"""
+        if self.question_pool is None:
+            return None
+        return self.question_pool.take(role, job_description, experience_level, num_questions)
+
+    def _generate_fresh_questions(self, role: str, job_description: str, experience_level: str,
+                                  num_questions: int) -> List[Dict[str, str]]:
+        """Question generation for the pool: bypasses the response cache so every set is new"""
+        return self._complete_json(
+            'questions',
+            schema=sized(QUESTION_SET_SCHEMA, num_questions),
+            system_prompt=self.QUESTIONS_SYSTEM_PROMPT,
+            prompt=self._questions_prompt(role, job_description, experience_level, num_questions),
+            temperature=0.7,
+            max_tokens=2000,
+            use_cache=False
+        )
+
+    def _questions_prompt(self, role: str, job_description: str, experience_level: str,
+                          num_questions: int) -> str:
+        return f"""You are an expert technical interviewer. Generate {num_questions} interview questions for the following position:
+
+Role: {role}
+Experience Level: {experience_level}
+Job Description: {job_description}
+
+Generate a mix of:
+1. Technical questions (specific to the role)
+2. Behavioral questions (using STAR method)
+3. Scenario-based questions
+4. Problem-solving questions
+
+Return ONLY a JSON array with this exact format:
+[
+  {{
+    "type": "technical|behavioral|scenario|problem-solving",
+    "question": "the question text",
+    "difficulty": "easy|medium|hard"
+  }}
+]
+
+Make questions challenging but appropriate for {experience_level} level. DO NOT include any text before or after the JSON array."""
+
+    def _feedback_prompt(self, role: str, questions_and_scores: List[Dict], emotion_data: Dict,
+                         avg_score: float) -> str:
+        """Overall feedback prompt with the question list compacted to fit feedback_prompt_tokens"""
+        template = f"""You are an expert career coach. Provide overall interview feedback:
 
 Role: {role}
 Number of Questions: {len(questions_and_scores)}
 Average Score: {avg_score:.1f}/100
 
 Question Performance:
-{json.dumps([{"question": q.get("question", ""), "score": q.get("score", 0), "type": q.get("type", "")} for q in questions_and_scores], indent=2)}
+{{performance}}
 
 Emotion Data:
 - Dominant Emotions: {emotion_data.get('dominant_emotions', [])}
@@ -259,51 +551,262 @@ Provide comprehensive feedback in JSON format:
 
 Be honest, constructive, and actionable. Return ONLY the JSON object."""
 
+        budget = self.feedback_prompt_tokens - self._estimate_tokens(template)
+        performance, mode = self._compact_performance(questions_and_scores, budget)
+        prompt = template.replace('{performance}', performance, 1)
+        print(f"[INFO] Overall feedback prompt: ~{self._estimate_tokens(prompt)} tokens "
+              f"for {len(questions_and_scores)} questions ({mode})")
+        return prompt
+
+    def _compact_performance(self, questions_and_scores: List[Dict], budget: int) -> Tuple[str, str]:
+        """
+        Render the per-question results as compact JSON within a token budget
+
+        Args:
+            questions_and_scores: List of questions with scores (answers are not sent)
+            budget: Tokens available for the rendered list
+
+        Returns:
+            (rendered JSON, "full" | "truncated" | "summarized")
+        """
+        rows = [
+            {"question": str(q.get("question", "")), "score": q.get("score", 0), "type": q.get("type", "")}
+            for q in questions_and_scores
+        ]
+
+        def render(limit: Optional[int] = None) -> str:
+            if limit is None:
+                return json.dumps(rows, separators=(',', ':'))
+            return json.dumps([
+                {**row, "question": row["question"] if len(row["question"]) <= limit
+                 else row["question"][:limit - 3] + "..."}
+                for row in rows
+            ], separators=(',', ':'))
+
+        performance = render()
+        if self._estimate_tokens(performance) <= budget:
+            return performance, "full"
+
+        # Cap question length: only the longest questions are cut, as little as needed
+        low = self.FEEDBACK_MIN_QUESTION_CHARS
+        high = max(len(row["question"]) for row in rows)
+        if self._estimate_tokens(render(low)) <= budget:
+            while low < high:
+                middle = (low + high + 1) // 2
+                if self._estimate_tokens(render(middle)) <= budget:
+                    low = middle
+                else:
+                    high = middle - 1
+            return render(low), "truncated"
+
+        # Still too long: per-type aggregates plus the weakest questions
+        by_type = {}
+        for row in rows:
+            by_type.setdefault(row["type"] or "general", []).append(self._as_score(row["score"]))
+        summary = {
+            "by_type": {
+                qtype: {"count": len(scores), "avg_score": round(sum(scores) / len(scores), 1),
+                        "min_score": min(scores), "max_score": max(scores)}
+                for qtype, scores in by_type.items()
+            },
+            "weakest": []
+        }
+        limit = self.FEEDBACK_MIN_QUESTION_CHARS
+        for row in sorted(rows, key=lambda r: self._as_score(r["score"])):
+            candidate = {**row, "question": row["question"][:limit]}
+            summary["weakest"].append(candidate)
+            if self._estimate_tokens(json.dumps(summary, separators=(',', ':'))) > budget:
+                summary["weakest"].pop()
+                break
+        return json.dumps(summary, separators=(',', ':')), "summarized"
+
+    @staticmethod
+    def _as_score(value) -> float:
         try:
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system",
-                        "content": "You are an expert career coach who provides comprehensive, actionable interview feedback. Always respond with valid JSON only."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=0.4,
-                max_tokens=2000
-            )
+            return float(value)
+        except (TypeError, ValueError):
+            return 0.0
+
+    @classmethod
+    def _estimate_tokens(cls, text: str) -> int:
+        """Local token estimate (no tokenizer round trip): ~4 characters per token"""
+        return len(text) // cls.CHARS_PER_TOKEN + 1
+
+    def _fallback_feedback(self, avg_score: float) -> Dict[str, any]:
+        return {
+            "overall_score": avg_score,
+            "performance_level": "average",
+            "summary": "Interview completed successfully.",
+            "technical_performance": "Unable to evaluate at this time.",
+            "communication_skills": "Unable to evaluate at this time.",
+            "emotional_intelligence": "Unable to evaluate at this time.",
+            "top_strengths": [],
+            "areas_for_improvement": [],
+            "recommendations": [],
+            "interview_readiness": avg_score
+        }
+
+    def _complete_json(self, method: str, schema: Dict, system_prompt: str, prompt: str,
+                       temperature: float, max_tokens: int, use_cache: bool = True) -> Any:
+        """
+        Run a chat completion and parse its JSON reply, going through the response cache
 
-            content = response.choices[0].message.content.strip()
+        Args:
+            method: Cache namespace and TTL key ('questions', 'score', 'feedback')
+            schema: Expected shape of the reply (see structured_output)
+            system_prompt: System message
+            prompt: User message
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            use_cache: Read and store the response cache
 
-            # Clean markdown
-            if content.startswith("```json"):
-                content = content[7:]
-            if content.startswith("```"):
-                content = content[3:]
-            if content.endswith("```"):
-                content = content[:-3]
-            content = content.strip()
+        Returns:
+            The parsed, validated JSON value
+        """
+        return self._start_json(method, schema, system_prompt, prompt, temperature, max_tokens, use_cache).result()
+
+    def _start_json(self, method: str, schema: Dict, system_prompt: str, prompt: str,
+                    temperature: float, max_tokens: int, use_cache: bool = True) -> concurrent.futures.Future:
+        """Non-blocking _complete_json: returns a future resolving to the parsed JSON value"""
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        result = concurrent.futures.Future()
 
-            feedback = json.loads(content)
-            return feedback
+        key = None
+        if self.cache is not None and use_cache:
+            key = LLMCache.make_key(self.model, messages, temperature, max_tokens)
+            cached = self._read_cache(key, method, schema)
+            if cached is not None:
+                result.set_result(cached)
+                return result
 
-        except Exception as e:
-            print(f"[ERROR] Failed to generate overall feedback: {str(e)}")
-            return {
-                "overall_score": avg_score,
-                "performance_level": "average",
-                "summary": "Interview completed successfully.",
-                "technical_performance": "Unable to evaluate at this time.",
-                "communication_skills": "Unable to evaluate at this time.",
-                "emotional_intelligence": "Unable to evaluate at this time.",
-                "top_strengths": [],
-                "areas_for_improvement": [],
-                "recommendations": [],
-                "interview_readiness": avg_score
-            }
+        def finish(call: concurrent.futures.Future, repaired: bool = False):
+            try:
+                settle(call, repaired)
+            except Exception as e:
+                # Never leave a caller waiting, e.g. when the repair call cannot be submitted
+                if not result.done():
+                    result.set_exception(e)
+
+        def settle(call: concurrent.futures.Future, repaired: bool):
+            try:
+                response = call.result()
+                self._log_usage(method, response)
+                content = response.choices[0].message.content or ''
+                parsed = parse_structured(content, schema)
+            except StructuredOutputError as e:
+                if repaired:
+                    raise
+                # One low-temperature repair call is cheaper than discarding the reply
+                print(f"[WARNING] Unusable {method} reply, requesting a repair: {str(e)}")
+                self.client.submit(
+                    model=self.model,
+                    messages=messages + [
+                        {"role": "assistant", "content": content},
+                        {"role": "user", "content": self.REPAIR_PROMPT.format(errors='; '.join(e.errors[:10]))}
+                    ],
+                    temperature=0,
+                    max_tokens=max_tokens
+                ).add_done_callback(lambda repair: hand_off(repair, repaired=True))
+                return
+
+            # Only validated replies are cached, stored as plain JSON
+            if key is not None:
+                try:
+                    self.cache.set(key, json.dumps(parsed), self.cache_ttls.get(method, 0))
+                except Exception as e:
+                    print(f"[WARNING] Failed to cache {method} reply: {str(e)}")
+            result.set_result(parsed)
+
+        def hand_off(call: concurrent.futures.Future, repaired: bool = False):
+            # Done callbacks run on the event loop thread: move the parsing and the SQLite write off it
+            try:
+                self._reply_executor.submit(finish, call, repaired)
+            except RuntimeError as e:
+                # Executor shut down (interpreter exit): fail the caller instead of leaving it waiting
+                result.set_exception(e)
+
+        self.client.submit(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ).add_done_callback(hand_off)
+        return result
+
+    def _stream_json(self, method: str, schema: Dict, system_prompt: str, prompt: str,
+                     temperature: float, max_tokens: int, use_cache: bool = True) -> Iterator[Any]:
+        """
+        Streaming _complete_json: yields each array element, or (key, value) member of an
+        object, as soon as it is complete, coerced and checked against its part of the schema
+
+        Args:
+            method: Cache namespace and TTL key ('questions', 'score', 'feedback')
+            schema: Expected shape of the whole reply, checked once it is complete
+            system_prompt: System message
+            prompt: User message
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            use_cache: Read and store the response cache
+
+        Returns:
+            Iterator over the completed items; its return value is the parsed, validated reply
+
+        Raises:
+            StructuredOutputError: If a streamed item or the complete reply does not match the schema
+        """
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": prompt}
+        ]
+        parser = JSONStreamParser(schema)
+
+        key = None
+        if self.cache is not None and use_cache:
+            key = LLMCache.make_key(self.model, messages, temperature, max_tokens)
+            cached = self._read_cache(key, method, schema)
+            if cached is not None:
+                yield from parser.feed(json.dumps(cached))
+                return cached
+
+        for delta in self.client.stream(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens
+        ):
+            yield from parser.feed(delta)
+            if parser.done:
+                break
+
+        if not parser.done:
+            raise ValueError("LLM stream ended before the JSON value was complete")
+
+        # Items already went out, so an invalid reply is not repaired here; it is only
+        # kept out of the cache and the caller switches to its fallback
+        parsed = parse_structured(parser.value, schema)
+        if key is not None:
+            self.cache.set(key, json.dumps(parsed), self.cache_ttls.get(method, 0))
+        return parsed
+
+    @staticmethod
+    def _log_usage(method: str, response):
+        """Tokens in/out as reported by the API"""
+        usage = getattr(response, 'usage', None)
+        if usage is not None:
+            print(f"[INFO] LLM {method}: {usage.prompt_tokens} tokens in, {usage.completion_tokens} tokens out")
+
+    def _read_cache(self, key: str, method: str, schema: Dict) -> Any:
+        """Cached value for the key, or None if missing or no longer matching the schema"""
+        cached = self.cache.get(key, namespace=method)
+        if cached is None:
+            return None
+        try:
+            return parse_structured(cached, schema)
+        except StructuredOutputError:
+            return None
 
     def _get_fallback_questions(self, role: str, num_questions: int) -> List[Dict[str, str]]:
         """Return generic fallback questions if API fails"""
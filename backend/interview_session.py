@@ -0,0 +1,84 @@
+"""
+Interview Session - Streaming emotion and facial-analysis aggregates per interview
+Every detection updates running totals in O(1), so overall feedback only needs the
+session id instead of the browser uploading every detection at the end
+"""
+
+import threading
+from typing import Dict, Optional
+
+# Emotions counted as nervous moments
+NERVOUS_EMOTIONS = ('Fear', 'Sad', 'Angry')
+
+# Eye contact above this counts as a good eye contact moment
+GOOD_EYE_CONTACT = 0.7
+
+
+class InterviewSessionStats:
+    """Running aggregates of one interview's detections"""
+
+    def __init__(self):
+        self.total = 0
+        self.emotion_counts: Dict[str, int] = {}
+        self.nervous_moments = 0
+        self.good_eye_contact_moments = 0
+
+        self.confidence_sum = 0.0
+        self.eye_contact_sum = 0.0
+        self.confidence_score_sum = 0.0
+        self.engagement_sum = 0.0
+
+        self._lock = threading.Lock()
+
+    def add(self, result: Dict, facial_analysis: Optional[Dict] = None):
+        """
+        Add one detection
+
+        Args:
+            result: The frame's primary face result ('emotion', 'confidence')
+            facial_analysis: The frame's facial analysis, if any
+        """
+        facial_analysis = facial_analysis or {}
+        emotion = result.get('emotion')
+        eye_contact = float(facial_analysis.get('eye_contact') or 0)
+
+        with self._lock:
+            self.total += 1
+            self.emotion_counts[emotion] = self.emotion_counts.get(emotion, 0) + 1
+            if emotion in NERVOUS_EMOTIONS:
+                self.nervous_moments += 1
+            if eye_contact > GOOD_EYE_CONTACT:
+                self.good_eye_contact_moments += 1
+
+            self.confidence_sum += float(result.get('confidence') or 0)
+            self.eye_contact_sum += eye_contact
+            self.confidence_score_sum += float(facial_analysis.get('confidence_score') or 0)
+            self.engagement_sum += float(facial_analysis.get('engagement_score') or 0)
+
+    def summary(self) -> Dict:
+        """
+        Emotion data in the format expected by InterviewService.generate_overall_feedback
+
+        Returns:
+            Dictionary with dominant emotions, averages and moment counters
+        """
+        with self._lock:
+            total = self.total
+            dominant_emotions = [
+                emotion for emotion, _ in
+                sorted(self.emotion_counts.items(), key=lambda item: item[1], reverse=True)[:3]
+            ]
+
+            def mean(value):
+                return value / total if total else 0.0
+
+            return {
+                'dominant_emotions': dominant_emotions,
+                'avg_confidence': mean(self.confidence_sum),
+                'nervous_moments': self.nervous_moments,
+                'total_emotions_detected': total,
+                'avg_eye_contact': mean(self.eye_contact_sum),
+                'avg_confidence_score': mean(self.confidence_score_sum),
+                'avg_engagement': mean(self.engagement_sum),
+                'eye_contact_percentage': mean(self.good_eye_contact_moments) * 100
+            }
@@ -0,0 +1,139 @@
+"""
+JSON Stream - Incremental parser for JSON replies that arrive in chunks
+Emits each element of a top-level array, or each member of a top-level object,
+as soon as its closing delimiter has been received
+"""
+
+import json
+from typing import Any, Dict, List, Optional
+
+from structured_output import StructuredOutputError, coerce_item, extract_json, validate
+
+
+class JSONStreamParser:
+    """Single-pass scanner over a streamed JSON array or object"""
+
+    def __init__(self, schema: Optional[Dict] = None):
+        """
+        Initialize the parser
+
+        Args:
+            schema: Expected shape of the whole reply; when given, only a container of its
+                type can start the value and every item is coerced and checked before it
+                is emitted, so a bracket in the preamble (e.g. "Here are [3] questions")
+                is skipped like extract_json skips it
+        """
+        self.schema = schema
+        self.text = ''          # Everything received so far (including any markdown fence)
+        self.container = None   # '[' or '{' once the top-level value has started
+        self.value = None       # Text of the top-level value once it closed
+        self.done = False       # True after the top-level value closed
+
+        if schema is None:
+            self._openers = '[{'
+        else:
+            self._openers = '[' if schema.get('type') is list else '{'
+
+        self._pos = 0           # Next character to scan
+        self._start = 0         # Opening bracket of the current top-level candidate
+        self._emitted = 0       # Items emitted from the current candidate
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._item_start = 0
+
+    def feed(self, chunk: str) -> List[Any]:
+        """
+        Add a chunk of the reply
+
+        Args:
+            chunk: Next piece of the streamed text
+
+        Returns:
+            Items completed by this chunk: array elements, or (key, value) pairs for an object
+
+        Raises:
+            StructuredOutputError: If an item after the first does not match the schema
+        """
+        self.text += chunk
+        items = []
+
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            c = text[i]
+            self._pos += 1
+
+            if self.container is None:
+                # Skip anything before the JSON value (e.g. a ```json fence)
+                if c in self._openers:
+                    self.container = c
+                    self._start = i
+                    self._emitted = 0
+                    self._depth = 1
+                    self._item_start = self._pos
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c in '[{':
+                self._depth += 1
+            elif c in ']}':
+                self._depth -= 1
+                if self._depth == 0:
+                    if self._finish_item(text[self._item_start:i], items) and self._complete():
+                        self.value = text[self._start:i + 1]
+                        self.done = True
+                    else:
+                        self._restart()
+            elif c == ',' and self._depth == 1:
+                if self._finish_item(text[self._item_start:i], items):
+                    self._item_start = self._pos
+                else:
+                    self._restart()
+
+        return items
+
+    def _finish_item(self, segment: str, items: List[Any]) -> bool:
+        """Parse, check and emit one item; False if the candidate is not the reply after all"""
+        segment = segment.strip()
+        if not segment:
+            return True  # Empty container or trailing comma
+        try:
+            if self.container == '[':
+                # Nested arrays/objects may carry trailing commas of their own
+                parsed = [extract_json(segment) if segment[0] in '[{' else json.loads(segment)]
+            else:
+                parsed = list(extract_json('{' + segment + '}').items())
+            if self.schema is not None:
+                parsed = [coerce_item(item, self.schema) for item in parsed]
+        except ValueError as e:
+            if self._emitted:
+                # Earlier items of this value were already sent
+                if isinstance(e, StructuredOutputError):
+                    raise
+                raise StructuredOutputError(f"Could not parse streamed item: {str(e)}")
+            # e.g. "[3]" or "[see below]" in a preamble: not the reply
+            return False
+        items.extend(parsed)
+        self._emitted += len(parsed)
+        return True
+
+    def _complete(self) -> bool:
+        """Whether the closed candidate can be the reply (an empty one only if the schema allows it)"""
+        return bool(self._emitted) or self.schema is None or not validate(self.schema['type'](), self.schema)
+
+    def _restart(self):
+        """Drop the current candidate and scan again from just after its opening bracket"""
+        self.container = None
+        self._pos = self._start + 1
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
@@ -0,0 +1,165 @@
+"""
+LLM Cache - Content-addressed cache for chat completion responses
+Responses are keyed by a hash of (model, messages, temperature, max_tokens) and kept
+in an in-memory LRU, optionally backed by an SQLite file shared across restarts
+and worker processes
+"""
+
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+
+class LLMCache:
+    """Two-tier (memory LRU + optional SQLite) response cache with per-entry TTLs"""
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None, max_disk_entries: int = 10000):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Responses kept in memory (least recently used are dropped)
+            db_path: SQLite file for the on-disk tier (None = memory only)
+            max_disk_entries: Responses kept on disk (oldest are dropped)
+        """
+        self.max_entries = max(1, int(max_entries))
+        self.max_disk_entries = max(1, int(max_disk_entries))
+        self.db_path = db_path
+
+        self._memory = OrderedDict()  # key -> (expires_at, value), least recently used first
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+        self._db = None
+        self._db_writes = 0
+        if db_path:
+            try:
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute('PRAGMA journal_mode=WAL')
+                self._db.execute(
+                    'CREATE TABLE IF NOT EXISTS llm_cache ('
+                    'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL, created_at REAL NOT NULL)'
+                )
+                self._db.execute('CREATE INDEX IF NOT EXISTS llm_cache_created ON llm_cache (created_at)')
+                self._db.commit()
+                print(f"[INFO] LLM cache persisted to {db_path}")
+            except sqlite3.Error as e:
+                print(f"[WARNING] LLM cache database unavailable, using memory only: {str(e)}")
+                self._db = None
+
+    @staticmethod
+    def make_key(model: str, messages: List[Dict], temperature: float, max_tokens: int) -> str:
+        """Hash of everything that determines the completion"""
+        payload = json.dumps(
+            {'model': model, 'messages': messages, 'temperature': temperature, 'max_tokens': max_tokens},
+            sort_keys=True, ensure_ascii=False
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def get(self, key: str, namespace: str = 'default') -> Optional[str]:
+        """
+        Look up a response
+
+        Args:
+            key: Cache key from make_key()
+            namespace: Label the hit/miss is counted under (e.g. the calling method)
+
+        Returns:
+            The cached response text, or None
+        """
+        now = time.time()
+        with self._lock:
+            stats = self._stats.setdefault(namespace, {'hits': 0, 'disk_hits': 0, 'misses': 0})
+
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._memory.move_to_end(key)
+                    stats['hits'] += 1
+                    return entry[1]
+                del self._memory[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        'SELECT value, expires_at FROM llm_cache WHERE key = ? AND expires_at > ?', (key, now)
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    print(f"[WARNING] LLM cache read failed: {str(e)}")
+                    row = None
+                if row is not None:
+                    # Promote to the memory tier
+                    self._remember(key, row[0], row[1])
+                    stats['hits'] += 1
+                    stats['disk_hits'] += 1
+                    return row[0]
+
+            stats['misses'] += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: float):
+        """
+        Store a response
+
+        Args:
+            key: Cache key from make_key()
+            value: Response text
+            ttl: Seconds the response stays valid (<= 0 disables caching)
+        """
+        if ttl <= 0:
+            return
+
+        now = time.time()
+        expires_at = now + ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        'INSERT OR REPLACE INTO llm_cache (key, value, expires_at, created_at) VALUES (?, ?, ?, ?)',
+                        (key, value, expires_at, now)
+                    )
+                    self._db_writes += 1
+                    # Prune occasionally rather than on every write
+                    if self._db_writes % 100 == 0:
+                        self._prune_disk(now)
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    print(f"[WARNING] LLM cache write failed: {str(e)}")
+
+    def _remember(self, key: str, value: str, expires_at: float):
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _prune_disk(self, now: float):
+        """Drop expired rows and the oldest rows over the size limit"""
+        self._db.execute('DELETE FROM llm_cache WHERE expires_at <= ?', (now,))
+        self._db.execute(
+            'DELETE FROM llm_cache WHERE key IN ('
+            'SELECT key FROM llm_cache ORDER BY created_at DESC LIMIT -1 OFFSET ?)',
+            (self.max_disk_entries,)
+        )
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters per namespace plus tier sizes"""
+        with self._lock:
+            namespaces = {}
+            for namespace, stats in self._stats.items():
+                lookups = stats['hits'] + stats['misses']
+                namespaces[namespace] = {
+                    **stats,
+                    'hit_rate': round(stats['hits'] / lookups, 3) if lookups else 0.0
+                }
+            return {
+                'memory_entries': len(self._memory),
+                'max_entries': self.max_entries,
+                'disk_enabled': self._db is not None,
+                'namespaces': namespaces
+            }
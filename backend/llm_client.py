@@ -0,0 +1,230 @@
+"""
+LLM Client - Shared asynchronous Groq client for the Flask worker threads
+All chat completions run on one background asyncio loop over a keep-alive
+connection pool, limited by a global semaphore and retried with jittered
+exponential backoff on rate limits (429), server errors (5xx) and timeouts
+"""
+
+import queue
+import asyncio
+import random
+import threading
+import concurrent.futures
+from typing import Dict, Iterator, Optional
+
+import httpx
+from groq import AsyncGroq, APIConnectionError, APIStatusError, APITimeoutError
+
+
+class LLMClient:
+    """Thread-safe facade over AsyncGroq running on a dedicated event loop"""
+
+    def __init__(
+        self,
+        api_key: str,
+        base_url: Optional[str] = None,
+        max_concurrency: int = 8,
+        timeout: float = 30.0,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 8.0
+    ):
+        """
+        Initialize the client and start its event loop
+
+        Args:
+            api_key: Groq API key
+            base_url: API base URL (None = Groq's default; point at a mock server for tests)
+            max_concurrency: Maximum LLM requests in flight across all threads
+            timeout: Per-attempt request timeout in seconds
+            max_retries: Retries after the first attempt for retryable errors
+            backoff_base: First retry delay in seconds (doubled for each further retry)
+            backoff_max: Upper bound for a single retry delay
+        """
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.timeout = float(timeout)
+        self.max_retries = max(0, int(max_retries))
+        self.backoff_base = float(backoff_base)
+        self.backoff_max = float(backoff_max)
+
+        # One keep-alive pool shared by every request; retries are handled here,
+        # not by the SDK, so they count against the semaphore
+        self._http = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency
+            ),
+            timeout=self.timeout
+        )
+        self._client = AsyncGroq(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            timeout=self.timeout,
+            http_client=self._http
+        )
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='llm-client', daemon=True)
+        self._thread.start()
+        # Created on the client's loop: before Python 3.10 an asyncio primitive binds to
+        # the loop of the thread that creates it, which would be the caller's here
+        self._semaphore = asyncio.run_coroutine_threadsafe(self._create_semaphore(), self._loop).result()
+
+        self._stats_lock = threading.Lock()
+        self.requests = 0
+        self.retries = 0
+        self.failures = 0
+        self.in_flight = 0
+
+    async def _create_semaphore(self) -> asyncio.Semaphore:
+        return asyncio.Semaphore(self.max_concurrency)
+
+    def submit(self, timeout: Optional[float] = None, **kwargs) -> concurrent.futures.Future:
+        """
+        Start a chat completion without blocking
+
+        Args:
+            timeout: Per-attempt timeout override in seconds
+            **kwargs: Arguments for chat.completions.create (model, messages, ...)
+
+        Returns:
+            Future resolving to the completion response
+        """
+        return asyncio.run_coroutine_threadsafe(self.acomplete(timeout=timeout, **kwargs), self._loop)
+
+    def complete(self, timeout: Optional[float] = None, **kwargs):
+        """Run a chat completion and wait for the response (same arguments as submit)"""
+        return self.submit(timeout=timeout, **kwargs).result()
+
+    async def acomplete(self, timeout: Optional[float] = None, **kwargs):
+        """Chat completion coroutine; must run on this client's loop"""
+        async with self._semaphore:
+            self._count('in_flight', 1)
+            try:
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        self._count('requests', 1)
+                        return await self._client.chat.completions.create(
+                            timeout=timeout or self.timeout, **kwargs
+                        )
+                    except (APIStatusError, APIConnectionError) as e:
+                        if attempt >= self.max_retries or not self._is_retryable(e):
+                            self._count('failures', 1)
+                            raise
+                        delay = self._backoff(attempt, e)
+                        print(f"[WARNING] LLM request failed ({self._describe(e)}), retrying in {delay:.2f}s")
+                        self._count('retries', 1)
+                        await asyncio.sleep(delay)
+            finally:
+                self._count('in_flight', -1)
+
+    def stream(self, timeout: Optional[float] = None, **kwargs) -> Iterator[str]:
+        """
+        Run a streaming chat completion and yield its text as it arrives
+
+        Args:
+            timeout: Per-attempt timeout override in seconds
+            **kwargs: Arguments for chat.completions.create (model, messages, ...)
+
+        Returns:
+            Iterator over content deltas; closing it early cancels the request
+        """
+        chunks = queue.Queue()
+        end = object()
+
+        async def pump():
+            try:
+                async for delta in self._astream(timeout, **kwargs):
+                    chunks.put(delta)
+                chunks.put(end)
+            except Exception as e:
+                chunks.put(e)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), self._loop)
+        try:
+            while True:
+                item = chunks.get()
+                if item is end:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Stops the request if the caller went away mid-stream
+            future.cancel()
+
+    async def _astream(self, timeout: Optional[float], **kwargs):
+        """Streaming completion; retried like acomplete, but only until the first delta arrived"""
+        async with self._semaphore:
+            self._count('in_flight', 1)
+            try:
+                started = False
+                for attempt in range(self.max_retries + 1):
+                    try:
+                        self._count('requests', 1)
+                        response = await self._client.chat.completions.create(
+                            stream=True, timeout=timeout or self.timeout, **kwargs
+                        )
+                        async for chunk in response:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                started = True
+                                yield delta
+                        return
+                    except (APIStatusError, APIConnectionError) as e:
+                        if started or attempt >= self.max_retries or not self._is_retryable(e):
+                            self._count('failures', 1)
+                            raise
+                        delay = self._backoff(attempt, e)
+                        print(f"[WARNING] LLM stream failed ({self._describe(e)}), retrying in {delay:.2f}s")
+                        self._count('retries', 1)
+                        await asyncio.sleep(delay)
+            finally:
+                self._count('in_flight', -1)
+
+    @staticmethod
+    def _is_retryable(error: Exception) -> bool:
+        """Rate limits, server errors, timeouts and dropped connections are retried"""
+        if isinstance(error, APIStatusError):
+            return error.status_code == 429 or error.status_code >= 500
+        return isinstance(error, (APIConnectionError, APITimeoutError))
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After when the server sends it"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        response = getattr(error, 'response', None)
+        retry_after = response.headers.get('retry-after') if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(self.backoff_max, float(retry_after)))
+            except ValueError:
+                pass
+        return delay
+
+    @staticmethod
+    def _describe(error: Exception) -> str:
+        status = getattr(error, 'status_code', None)
+        return f"HTTP {status}" if status else type(error).__name__
+
+    def _count(self, name: str, delta: int):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def get_stats(self) -> Dict:
+        """Request, retry and failure counters"""
+        with self._stats_lock:
+            return {
+                'max_concurrency': self.max_concurrency,
+                'in_flight': self.in_flight,
+                'requests': self.requests,
+                'retries': self.retries,
+                'failures': self.failures
+            }
+
+    def close(self):
+        """Close the connection pool and stop the event loop"""
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
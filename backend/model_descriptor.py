@@ -0,0 +1,142 @@
+"""
+Model Descriptor - Input format and label order of an emotion model
+Derived from the model's input shape, optionally overridden by a JSON sidecar next to
+the model file, so preprocessing is configured once instead of probed with trial predictions
+
+Sidecar example (Custom_CNN_model.json next to Custom_CNN_model.keras):
+    {"input_size": [48, 48], "channels": 1, "normalization": "unit",
+     "labels": ["Angry", "Disgust", "Fear", "Happy", "Neutral", "Sad", "Surprise"]}
+"""
+
+import os
+import json
+from typing import Dict, Optional, Sequence, Tuple
+
+EMOTION_LABELS = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
+
+# Pixel value -> model input: value * scale + offset
+NORMALIZATIONS = {
+    'unit': (1.0 / 255.0, 0.0),         # [0, 1] (what the bundled models were trained on)
+    'symmetric': (2.0 / 255.0, -1.0),   # [-1, 1]
+    'none': (1.0, 0.0)                  # raw 0-255
+}
+
+DEFAULT_INPUT_SIZE = (224, 224)
+
+
+class ModelDescriptor:
+    """Input size, channels, color order, normalization and labels of a model"""
+
+    def __init__(
+        self,
+        input_size: Tuple[int, int] = DEFAULT_INPUT_SIZE,
+        channels: int = 3,
+        color_order: str = 'bgr',
+        normalization: str = 'unit',
+        labels: Optional[Sequence[str]] = None
+    ):
+        """
+        Initialize the descriptor
+
+        Args:
+            input_size: Model input (width, height)
+            channels: 3 for color input, 1 for grayscale
+            color_order: Channel order of color input, "bgr" (OpenCV frames as-is) or "rgb"
+            normalization: One of NORMALIZATIONS
+            labels: Class names in output order
+        """
+        if channels not in (1, 3):
+            raise ValueError(f"Unsupported number of input channels: {channels}")
+        if normalization not in NORMALIZATIONS:
+            raise ValueError(f"Unknown normalization '{normalization}' (expected one of {list(NORMALIZATIONS)})")
+        if color_order not in ('bgr', 'rgb'):
+            raise ValueError(f"Unknown color order '{color_order}'")
+
+        self.input_size = (int(input_size[0]), int(input_size[1]))
+        self.channels = int(channels)
+        self.color_order = color_order
+        self.normalization = normalization
+        self.labels = list(labels or EMOTION_LABELS)
+
+        # Arguments for PreparedFrame.crop_batch, fixed once per model
+        scale, offset = NORMALIZATIONS[normalization]
+        self.crop_options = {
+            'input_size': self.input_size,
+            'channels': self.channels,
+            'scale': scale,
+            'offset': offset,
+            'rgb': self.channels == 3 and color_order == 'rgb'
+        }
+
+    @property
+    def input_shape(self) -> Tuple[int, int, int]:
+        """Per-sample model input shape (height, width, channels)"""
+        return (self.input_size[1], self.input_size[0], self.channels)
+
+    @property
+    def grayscale(self) -> bool:
+        return self.channels == 1
+
+    @classmethod
+    def from_model(cls, input_shape: Sequence[Optional[int]], model_path: Optional[str] = None) -> 'ModelDescriptor':
+        """
+        Build the descriptor from a model's input shape and its sidecar file
+
+        Args:
+            input_shape: Model input shape, with or without the batch dimension
+                (e.g. model.input_shape or a predictor's input_shape)
+            model_path: Model file; "<name>.json" next to it overrides any field
+
+        Returns:
+            The model's descriptor
+        """
+        shape = list(input_shape)
+        if len(shape) == 4:
+            shape = shape[1:]
+        if len(shape) == 2:
+            shape = shape + [1]
+        if len(shape) != 3:
+            raise ValueError(f"Unsupported model input shape: {tuple(input_shape)}")
+
+        height, width, channels = shape
+        options = {
+            'input_size': (int(width), int(height)) if width and height else DEFAULT_INPUT_SIZE,
+            'channels': int(channels or 3)
+        }
+
+        sidecar = cls.sidecar_path(model_path) if model_path else None
+        if sidecar and os.path.exists(sidecar):
+            options.update(cls._read_sidecar(sidecar))
+            print(f"[INFO] Model descriptor overrides loaded from {os.path.basename(sidecar)}")
+
+        return cls(**options)
+
+    @staticmethod
+    def sidecar_path(model_path: str) -> str:
+        return os.path.splitext(model_path)[0] + '.json'
+
+    @staticmethod
+    def _read_sidecar(path: str) -> Dict:
+        with open(path) as f:
+            data = json.load(f)
+        allowed = ('input_size', 'channels', 'color_order', 'normalization', 'labels')
+        unknown = set(data) - set(allowed)
+        if unknown:
+            print(f"[WARNING] Ignoring unknown model descriptor fields: {sorted(unknown)}")
+        return {key: data[key] for key in allowed if key in data}
+
+    def to_dict(self) -> Dict:
+        return {
+            'input_size': list(self.input_size),
+            'channels': self.channels,
+            'color_order': self.color_order,
+            'normalization': self.normalization,
+            'labels': list(self.labels)
+        }
+
+    def __repr__(self) -> str:
+        return f"ModelDescriptor({self.to_dict()})"
+
+    def label_scores(self, prediction: Sequence[float]) -> Dict[str, float]:
+        """Map one output row to {label: probability}"""
+        return {label: float(prediction[i]) for i, label in enumerate(self.labels)}
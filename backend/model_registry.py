@@ -0,0 +1,173 @@
+"""
+Model Registry - Named emotion models and the policies that route faces to them
+Each model is loaded once on first use. A request names a policy: a single model, or
+"cascade", which classifies every face with the cheapest model first and only sends
+faces whose top-1 confidence is below a threshold on to the next (larger) model
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from frame_pipeline import Box, PreparedFrame
+from model_descriptor import ModelDescriptor
+from once_loader import OnceLoader
+
+CASCADE = 'cascade'
+
+# (output row, descriptor of the model that produced it, model name)
+Classification = Tuple[np.ndarray, ModelDescriptor, str]
+
+
+class ModelRegistry:
+    """Lazily loaded models plus single-model and cascade routing with per-tier stats"""
+
+    def __init__(self, cascade_tiers: Sequence[str] = (), cascade_threshold: float = 0.6):
+        """
+        Initialize the registry
+
+        Args:
+            cascade_tiers: Model names from cheapest to most accurate
+            cascade_threshold: Faces whose top-1 probability is below this go to the next tier
+        """
+        self.cascade_tiers = list(cascade_tiers)
+        self.cascade_threshold = float(cascade_threshold)
+
+        # name -> {'loader': OnceLoader, 'predict': callable or None}
+        self._models = OrderedDict()
+        self._stats_lock = threading.Lock()
+        self._tier_stats = {}           # name -> [calls, faces, total_ms]
+        self.cascade_faces = 0
+        self.escalated = 0
+        self.skipped_tiers = 0          # Faces passed on because a tier failed to load
+
+    def register(self, name: str, loader: OnceLoader, predict_fn: Optional[Callable] = None):
+        """
+        Add a model
+
+        Args:
+            name: Policy name of the model
+            loader: Loads (predictor, ModelDescriptor) once
+            predict_fn: Runs a preprocessed batch (defaults to the predictor's predict,
+                e.g. pass a scheduler-backed function for the main model)
+        """
+        self._models[name] = {'loader': loader, 'predict': predict_fn}
+        self._tier_stats[name] = [0, 0, 0.0]
+
+    @property
+    def policies(self) -> List[str]:
+        return list(self._models) + ([CASCADE] if self.cascade_tiers else [])
+
+    def resolve(self, policy: str) -> List[str]:
+        """
+        Model names a policy runs through, in order
+
+        Raises:
+            ValueError: For an unknown policy
+        """
+        if policy == CASCADE and self.cascade_tiers:
+            return list(self.cascade_tiers)
+        if policy in self._models:
+            return [policy]
+        raise ValueError(f"Unknown model policy '{policy}' (available: {', '.join(self.policies)})")
+
+    def get(self, name: str, timeout: Optional[float] = None) -> Tuple[object, ModelDescriptor]:
+        """(predictor, descriptor) of a model, loading it on first use"""
+        return self._models[name]['loader'].get(timeout=timeout)
+
+    def classify(self, prepared: PreparedFrame, faces: Sequence[Box], policy: str,
+                 timeout: Optional[float] = None) -> List[Classification]:
+        """
+        Classify face crops according to a policy
+
+        Args:
+            prepared: Frame the faces were found in
+            faces: Full-resolution (x, y, w, h) face boxes
+            policy: A model name or "cascade"
+            timeout: Seconds to wait for a model that another thread is loading
+
+        Returns:
+            One (probabilities, descriptor, model name) per face, in face order
+        """
+        tiers = self.resolve(policy)
+        results = [None] * len(faces)
+        pending = list(range(len(faces)))
+        if len(tiers) > 1:
+            self._count('cascade_faces', len(faces))
+
+        for level, name in enumerate(tiers):
+            last = level == len(tiers) - 1
+            try:
+                predictor, descriptor = self.get(name, timeout=timeout)
+            except Exception:
+                if last:
+                    raise
+                # A missing cheap model must not break detection: the next tier takes over
+                self._count('skipped_tiers', len(pending))
+                continue
+
+            started = time.perf_counter()
+            batch = prepared.crop_batch([faces[i] for i in pending], **descriptor.crop_options)
+            predictions = (self._models[name]['predict'] or predictor.predict)(batch)
+            self._record_tier(name, len(pending), (time.perf_counter() - started) * 1000)
+
+            escalate = []
+            for index, row in zip(pending, predictions):
+                if last or float(np.max(row)) >= self.cascade_threshold:
+                    results[index] = (row, descriptor, name)
+                else:
+                    escalate.append(index)
+
+            if escalate:
+                self._count('escalated', len(escalate))
+            pending = escalate
+            if not pending:
+                break
+
+        return results
+
+    def warm_up(self, names: Sequence[str]):
+        """Load the named models now; a failing model is reported and left for later"""
+        for name in names:
+            try:
+                self.get(name)
+            except Exception as e:
+                print(f"[WARNING] Model '{name}' not warmed up: {str(e)}")
+
+    def _record_tier(self, name: str, faces: int, elapsed_ms: float):
+        with self._stats_lock:
+            stats = self._tier_stats[name]
+            stats[0] += 1
+            stats[1] += faces
+            stats[2] += elapsed_ms
+
+    def _count(self, name: str, delta: int):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + delta)
+
+    def get_stats(self) -> Dict:
+        """Per-model load state and latency, plus the cascade escalation rate"""
+        with self._stats_lock:
+            tiers = {
+                name: {
+                    'calls': calls,
+                    'faces': faces,
+                    'avg_batch_ms': round(total_ms / calls, 3) if calls else 0.0,
+                    'avg_face_ms': round(total_ms / faces, 3) if faces else 0.0
+                }
+                for name, (calls, faces, total_ms) in self._tier_stats.items()
+            }
+            cascade = {
+                'tiers': list(self.cascade_tiers),
+                'threshold': self.cascade_threshold,
+                'faces': self.cascade_faces,
+                'escalated': self.escalated,
+                'skipped_tiers': self.skipped_tiers,
+                'escalation_rate': round(self.escalated / self.cascade_faces, 3) if self.cascade_faces else 0.0
+            }
+        for name, entry in self._models.items():
+            tiers[name]['loader'] = entry['loader'].get_stats()
+        return {'models': tiers, 'cascade': cascade}
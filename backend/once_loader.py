@@ -0,0 +1,134 @@
+"""
+Once Loader - Thread-safe, once-only initialization of an expensive resource
+The first caller runs the load while every concurrent caller blocks on an event and
+wakes the moment it finishes; a failure is handed to all waiters and retried only
+after an exponential backoff
+"""
+
+import time
+import threading
+from typing import Callable, Dict, Generic, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class LoadError(Exception):
+    """Raised to callers when the load failed or is backing off after a failure"""
+
+
+class OnceLoader(Generic[T]):
+    """Runs load_fn at most once at a time and caches its result"""
+
+    def __init__(
+        self,
+        load_fn: Callable[[], T],
+        name: str = 'resource',
+        retry_base: float = 2.0,
+        retry_max: float = 60.0
+    ):
+        """
+        Initialize the loader
+
+        Args:
+            load_fn: Loads the resource (runs in the first caller's thread)
+            name: Used in log and error messages
+            retry_base: Seconds before the first retry after a failure (doubled per failure)
+            retry_max: Upper bound for the retry delay
+        """
+        self.load_fn = load_fn
+        self.name = name
+        self.retry_base = float(retry_base)
+        self.retry_max = float(retry_max)
+
+        self._value = None
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._event = None              # Set while a load is running; waiters block on it
+        self._error = None              # Last failure, handed to waiters and callers during backoff
+        self._retry_at = 0.0
+        self.failures = 0               # Consecutive failures
+        self.load_seconds = None
+
+    def get(self, timeout: Optional[float] = None) -> T:
+        """
+        Return the resource, loading it if needed
+
+        Args:
+            timeout: Seconds to wait for a load started by another thread (None = no limit)
+
+        Returns:
+            The loaded resource
+
+        Raises:
+            LoadError: If the load failed, is backing off, or the wait timed out
+        """
+        if self._loaded:
+            return self._value
+
+        with self._lock:
+            if self._loaded:
+                return self._value
+            event = self._event
+            if event is None:
+                if self._error is not None and time.monotonic() < self._retry_at:
+                    raise LoadError(
+                        f"{self.name} unavailable, retrying in {self._retry_at - time.monotonic():.1f}s: {self._error}"
+                    )
+                # This thread loads; everyone else arriving now waits on the event
+                self._event = threading.Event()
+
+        if event is not None:
+            if not event.wait(timeout):
+                raise LoadError(f"Timeout waiting for {self.name} to load")
+            if self._loaded:
+                return self._value
+            raise LoadError(f"Failed to load {self.name}: {self._error}")
+
+        return self._load()
+
+    def _load(self) -> T:
+        started = time.perf_counter()
+        try:
+            value = self.load_fn()
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                delay = min(self.retry_max, self.retry_base * (2 ** (self.failures - 1)))
+                self._error = e
+                self._retry_at = time.monotonic() + delay
+                event, self._event = self._event, None
+            print(f"[ERROR] Failed to load {self.name} (attempt {self.failures}), next retry in {delay:.1f}s: {str(e)}")
+            event.set()
+            raise LoadError(f"Failed to load {self.name}: {str(e)}") from e
+
+        with self._lock:
+            self._value = value
+            self._loaded = True
+            self._error = None
+            self.failures = 0
+            self.load_seconds = time.perf_counter() - started
+            event, self._event = self._event, None
+        event.set()
+        return value
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded
+
+    def get_stats(self) -> Dict:
+        """Load state, duration and failure count"""
+        with self._lock:
+            if self._loaded:
+                state = 'loaded'
+            elif self._event is not None:
+                state = 'loading'
+            elif self._error is not None:
+                state = 'failed'
+            else:
+                state = 'not_loaded'
+            return {
+                'state': state,
+                'load_seconds': round(self.load_seconds, 3) if self.load_seconds is not None else None,
+                'failures': self.failures,
+                'last_error': str(self._error) if self._error is not None else None
+            }
@@ -0,0 +1,245 @@
+"""
+Question Pool - Pre-generated interview question sets, refilled in the background
+Keeps a few validated, distinct question sets per (role, job description, experience
+level, question count) so interview setup can be served without waiting for the LLM
+"""
+
+import re
+import time
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+QUESTION_TYPES = ('technical', 'behavioral', 'scenario', 'problem-solving')
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', str(text or '')).strip().lower()
+
+
+def is_valid_question_set(questions, num_questions: int) -> bool:
+    """A usable set: the requested number of questions, each with text, type and difficulty"""
+    return (
+        isinstance(questions, list)
+        and len(questions) == num_questions
+        and all(
+            isinstance(q, dict)
+            and isinstance(q.get('question'), str) and q['question'].strip()
+            and q.get('type') in QUESTION_TYPES
+            and q.get('difficulty') in ('easy', 'medium', 'hard')
+            for q in questions
+        )
+    )
+
+
+class QuestionPool:
+    """Per-key queues of ready question sets with background refill, TTL and de-duplication"""
+
+    def __init__(
+        self,
+        generate_fn: Callable[..., List[Dict]],
+        size: int = 3,
+        ttl: float = 3600.0,
+        max_keys: int = 32,
+        workers: int = 2,
+        min_requests: int = 2
+    ):
+        """
+        Initialize the pool
+
+        Args:
+            generate_fn: Generates a fresh (uncached) question set; called with role,
+                job_description, experience_level and num_questions
+            size: Ready sets kept per key
+            ttl: Seconds a generated set stays fresh
+            max_keys: Recently requested keys kept warm (presets are always kept)
+            workers: Background refill threads
+            min_requests: Requests for a key before it is filled, so a one-off job
+                description costs no background LLM calls (presets are filled at once)
+        """
+        self.generate_fn = generate_fn
+        self.size = max(1, int(size))
+        self.ttl = float(ttl)
+        self.max_keys = max(1, int(max_keys))
+        self.min_requests = max(1, int(min_requests))
+
+        # key -> {'params', 'requests', 'sets': deque[(created_at, fingerprint, questions)], 'served': deque[fingerprint]}
+        self._entries = OrderedDict()
+        self._pinned = set()
+        self._refilling = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, int(workers)), thread_name_prefix='question-pool')
+
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.expired = 0
+
+    @staticmethod
+    def make_key(role: str, job_description: str, experience_level: str, num_questions: int) -> Tuple:
+        return (_normalize(role), _normalize(job_description), _normalize(experience_level), int(num_questions))
+
+    def add_preset(self, role: str, job_description: str, experience_level: str = 'mid', num_questions: int = 5):
+        """Keep a key warm permanently and start filling it"""
+        params = self._params(role, job_description, experience_level, num_questions)
+        key = self.make_key(**params)
+        with self._lock:
+            self._pinned.add(key)
+            self._register(key, params)
+        self._schedule(key)
+
+    def take(self, role: str, job_description: str, experience_level: str = 'mid',
+             num_questions: int = 5) -> Optional[List[Dict]]:
+        """
+        Take a ready question set and trigger a refill
+
+        Args:
+            role: Job title/role
+            job_description: Detailed job description
+            experience_level: One of "entry", "mid", "senior"
+            num_questions: Number of questions
+
+        Returns:
+            A question set not served before for this key, or None on a miss
+            (the key is filled in the background once it was requested min_requests times)
+        """
+        params = self._params(role, job_description, experience_level, num_questions)
+        key = self.make_key(**params)
+
+        questions = None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._register(key, params)
+            else:
+                self._entries.move_to_end(key)
+                self._drop_expired(entry)
+                if entry['sets']:
+                    _, fingerprint, questions = entry['sets'].popleft()
+                    entry['served'].append(fingerprint)
+            entry['requests'] += 1
+            refill = entry['requests'] >= self.min_requests or key in self._pinned
+            if questions is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if refill:
+            self._schedule(key)
+        return [dict(q) for q in questions] if questions is not None else None
+
+    def record_served(self, role: str, job_description: str, experience_level: str,
+                      num_questions: int, questions: List[Dict]):
+        """Remember a set generated outside the pool so the pool never serves an identical one"""
+        key = self.make_key(role, job_description, experience_level, num_questions)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry['served'].append(self._fingerprint(questions))
+
+    @staticmethod
+    def _fingerprint(questions: List[Dict]) -> Tuple:
+        return tuple(sorted(_normalize(q.get('question')) for q in questions if isinstance(q, dict)))
+
+    def _params(self, role, job_description, experience_level, num_questions) -> Dict:
+        return {
+            'role': role,
+            'job_description': job_description,
+            'experience_level': experience_level,
+            'num_questions': int(num_questions)
+        }
+
+    def _register(self, key: Tuple, params: Dict) -> Dict:
+        """Entry of the key, created if needed (call with the lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            entry = self._entries[key] = {
+                'params': params,
+                'requests': 0,
+                'sets': deque(),
+                'served': deque(maxlen=self.size * 4)
+            }
+            self._evict_keys()
+        return entry
+
+    def _schedule(self, key: Tuple):
+        """Start a refill unless one is running, the key is full or it was evicted"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or key in self._refilling or len(entry['sets']) >= self.size:
+                return
+            self._refilling.add(key)
+        self._executor.submit(self._refill, key)
+
+    def _evict_keys(self):
+        """Drop the least recently requested non-preset keys over max_keys"""
+        unpinned = [k for k in self._entries if k not in self._pinned]
+        for key in unpinned[:max(0, len(unpinned) - self.max_keys)]:
+            del self._entries[key]
+
+    def _refill(self, key: Tuple):
+        """Generate sets until the key is full; gives up after a few rejected attempts"""
+        try:
+            for _ in range(self.size * 2):
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        return
+                    self._drop_expired(entry)
+                    if len(entry['sets']) >= self.size:
+                        return
+                    params = entry['params']
+
+                try:
+                    questions = self.generate_fn(**params)
+                except Exception as e:
+                    print(f"[WARNING] Question pool refill failed for '{params['role']}': {str(e)}")
+                    return
+
+                if not is_valid_question_set(questions, params['num_questions']):
+                    with self._lock:
+                        self.invalid += 1
+                    continue
+
+                fingerprint = self._fingerprint(questions)
+                with self._lock:
+                    entry = self._entries.get(key)
+                    if entry is None:
+                        return
+                    known = {s[1] for s in entry['sets']} | set(entry['served'])
+                    if fingerprint in known:
+                        # Candidates must not get a set identical to one already pooled or served
+                        self.duplicates += 1
+                        continue
+                    entry['sets'].append((time.monotonic(), fingerprint, questions))
+                    self.generated += 1
+        finally:
+            with self._lock:
+                self._refilling.discard(key)
+
+    def _drop_expired(self, entry: Dict):
+        now = time.monotonic()
+        while entry['sets'] and now - entry['sets'][0][0] > self.ttl:
+            entry['sets'].popleft()
+            self.expired += 1
+
+    def get_stats(self) -> Dict:
+        """Hit/miss and refill counters plus the number of ready sets"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'keys': len(self._entries),
+                'presets': len(self._pinned),
+                'ready_sets': sum(len(entry['sets']) for entry in self._entries.values()),
+                'refilling': len(self._refilling),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'generated': self.generated,
+                'duplicates': self.duplicates,
+                'invalid': self.invalid,
+                'expired': self.expired
+            }
@@ -0,0 +1,87 @@
+"""
+Session Store - Bounded per-client state keyed by session id
+Evicts sessions that have been idle too long and caps the number of live sessions
+"""
+
+import time
+import threading
+from collections import OrderedDict
+from typing import Callable, Generic, List, Optional, TypeVar
+
+T = TypeVar('T')
+
+
+class SessionStore(Generic[T]):
+    """Thread-safe LRU map of session id -> state with idle expiry"""
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        max_sessions: int = 1000,
+        idle_ttl: float = 300.0,
+        on_evict: Optional[Callable[[str, T], None]] = None
+    ):
+        """
+        Initialize the store
+
+        Args:
+            factory: Creates the state object for a new session
+            max_sessions: Least recently used sessions are dropped beyond this
+            idle_ttl: Seconds without activity before a session is dropped
+            on_evict: Called with (session_id, state) when a session expires or is removed
+        """
+        self.factory = factory
+        self.max_sessions = max(1, int(max_sessions))
+        self.idle_ttl = float(idle_ttl)
+        self.on_evict = on_evict
+
+        self._sessions = OrderedDict()  # session_id -> (last_seen, state), oldest first
+        self._lock = threading.Lock()
+        self.evicted = 0
+
+    def get(self, session_id: str) -> T:
+        """Return the session's state, creating it if needed"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            state = entry[1] if entry is not None else self.factory()
+            self._sessions[session_id] = (now, state)
+            self._evict(now)
+            return state
+
+    def peek(self, session_id: str) -> Optional[T]:
+        """Return the session's state without creating it or refreshing its activity"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            return entry[1] if entry is not None else None
+
+    def pop(self, session_id: str) -> Optional[T]:
+        """Remove a session and return its state"""
+        with self._lock:
+            entry = self._sessions.pop(session_id, None)
+            if entry is None:
+                return None
+            if self.on_evict is not None:
+                self.on_evict(session_id, entry[1])
+            return entry[1]
+
+    def values(self) -> List[T]:
+        """Snapshot of all live session states"""
+        with self._lock:
+            return [state for _, state in self._sessions.values()]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def _evict(self, now: float):
+        """Drop idle sessions and the least recently used ones over capacity (oldest are first)"""
+        while self._sessions:
+            session_id, (last_seen, _) = next(iter(self._sessions.items()))
+            if len(self._sessions) > self.max_sessions or now - last_seen > self.idle_ttl:
+                _, state = self._sessions.pop(session_id)
+                self.evicted += 1
+                if self.on_evict is not None:
+                    self.on_evict(session_id, state)
+            else:
+                break
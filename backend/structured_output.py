@@ -0,0 +1,257 @@
+"""
+Structured Output - Extract and validate JSON from LLM replies
+Finds the JSON array or object in a reply in a single scan, tolerating markdown
+fences, prose before or after it and trailing commas, then checks it against a
+small per-method schema
+"""
+
+import json
+import re
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional, Tuple
+
+_NUMBER = re.compile(r'^\s*-?\d+(\.\d+)?\s*%?\s*$')
+
+# Schemas: {'type': list|dict|str|'number', 'items': schema, 'min_items'/'max_items': n,
+#           'required': {field: schema}}
+QUESTION_SCHEMA = {
+    'type': dict,
+    'required': {'type': {'type': str}, 'question': {'type': str}, 'difficulty': {'type': str}}
+}
+QUESTION_SET_SCHEMA = {'type': list, 'items': QUESTION_SCHEMA, 'min_items': 1}
+
+EVALUATION_SCHEMA = {
+    'type': dict,
+    'required': {
+        'score': {'type': 'number'},
+        'feedback': {'type': str},
+        'strengths': {'type': list},
+        'improvements': {'type': list},
+        'key_points_covered': {'type': list},
+        'missing_points': {'type': list}
+    }
+}
+EVALUATION_LIST_SCHEMA = {'type': list, 'items': EVALUATION_SCHEMA, 'min_items': 1}
+
+FEEDBACK_SCHEMA = {
+    'type': dict,
+    'required': {
+        'overall_score': {'type': 'number'},
+        'performance_level': {'type': str},
+        'summary': {'type': str},
+        'top_strengths': {'type': list},
+        'areas_for_improvement': {'type': list},
+        'recommendations': {'type': list}
+    }
+}
+
+
+class StructuredOutputError(ValueError):
+    """Reply did not contain valid JSON matching the schema"""
+
+    def __init__(self, message: str, errors: Optional[List[str]] = None):
+        super().__init__(message)
+        self.errors = errors or [message]
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the first complete JSON array or object in the text
+
+    Args:
+        text: LLM reply, possibly with fences, prose or trailing commas
+
+    Returns:
+        The parsed value
+
+    Raises:
+        StructuredOutputError: If no candidate parses
+    """
+    last_error = 'JSON value is not closed' if '[' in text or '{' in text else 'no JSON array or object found'
+    # Quotes in the prose around the JSON are ignored first (a stray 5" must not open a
+    # string); if that finds nothing usable, prose quotes are honored so a quoted "{" is skipped
+    tried = None
+    for prose_strings in (False, True):
+        spans, dropped = _scan_spans(text, prose_strings)
+        if spans == tried:
+            break
+        for start, end in spans:
+            try:
+                return json.loads(_candidate(text, start, end, dropped))
+            except ValueError as e:
+                # e.g. "[see below]" in a preamble: try the next opening bracket
+                last_error = str(e)
+        tried = spans
+    raise StructuredOutputError(f"Could not parse JSON from reply: {last_error}")
+
+
+def _scan_spans(text: str, prose_strings: bool) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """
+    One pass over the text: every balanced bracketed value, plus the trailing commas to drop
+
+    Args:
+        text: Text to scan
+        prose_strings: Track double-quoted strings outside brackets too
+
+    Returns:
+        ((start, end) of each closed value sorted by start, sorted positions of trailing commas)
+    """
+    spans = []
+    dropped = []
+    stack = []          # Positions of the brackets that are still open
+    in_string = False
+    escape = False
+    comma = None        # Last comma outside strings, if only whitespace followed it
+
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == '\\':
+                escape = True
+            elif c == '"':
+                in_string = False
+            continue
+
+        if c == '"':
+            in_string = bool(stack) or prose_strings
+            comma = None
+        elif c in '[{':
+            stack.append(i)
+            comma = None
+        elif c in ']}':
+            if stack:
+                if comma is not None:
+                    dropped.append(comma)
+                spans.append((stack.pop(), i))
+            comma = None
+        elif c == ',':
+            comma = i
+        elif not c.isspace():
+            comma = None
+
+    spans.sort()
+    return spans, dropped
+
+
+def _candidate(text: str, start: int, end: int, dropped: List[int]) -> str:
+    """The value text[start:end + 1] without its trailing commas"""
+    pieces = []
+    pos = start
+    for comma in dropped[bisect_left(dropped, start):bisect_left(dropped, end)]:
+        pieces.append(text[pos:comma])
+        pos = comma + 1
+    pieces.append(text[pos:end + 1])
+    return ''.join(pieces)
+
+
+def validate(value: Any, schema: Dict, path: str = '$') -> List[str]:
+    """
+    Check a parsed value against a schema, coercing numeric strings in place
+
+    Args:
+        value: Parsed JSON value
+        schema: Schema dictionary (see the module constants)
+        path: Location used in error messages
+
+    Returns:
+        List of problems (empty when the value is valid)
+    """
+    expected = schema.get('type')
+    if expected == 'number':
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return [f"{path} must be a number"]
+        return []
+    if expected is not None and not isinstance(value, expected):
+        return [f"{path} must be {'an array' if expected is list else 'an object' if expected is dict else 'a string'}"]
+
+    errors = []
+    if expected is list:
+        if len(value) < schema.get('min_items', 0):
+            errors.append(f"{path} must have at least {schema['min_items']} item(s)")
+        if 'max_items' in schema and len(value) > schema['max_items']:
+            errors.append(f"{path} must have at most {schema['max_items']} item(s)")
+        item_schema = schema.get('items')
+        if item_schema:
+            for i, item in enumerate(value):
+                errors.extend(validate(item, item_schema, f"{path}[{i}]"))
+    elif expected is dict:
+        for field, field_schema in schema.get('required', {}).items():
+            if field not in value:
+                errors.append(f"{path}.{field} is missing")
+                continue
+            value[field] = _coerce(value[field], field_schema)
+            errors.extend(validate(value[field], field_schema, f"{path}.{field}"))
+    return errors
+
+
+def _coerce(value: Any, schema: Dict) -> Any:
+    """"85" or "85%" instead of 85 for a number field; anything else unchanged"""
+    if schema.get('type') == 'number' and isinstance(value, str) and _NUMBER.match(value):
+        value = float(value.strip().rstrip('%'))
+        if value.is_integer():
+            value = int(value)
+    return value
+
+
+def coerce_item(item: Any, schema: Dict) -> Any:
+    """
+    Apply a reply schema's coercions to one streamed item and check it, so a streamed
+    value is only sent if it matches what parse_structured accepts for the whole reply
+
+    Args:
+        item: An array element, or a (key, value) member of an object
+        schema: Schema of the whole reply
+
+    Returns:
+        The coerced item
+
+    Raises:
+        StructuredOutputError: If the item does not match its part of the schema
+    """
+    errors = []
+    if schema.get('type') is dict:
+        key, value = item
+        field_schema = schema.get('required', {}).get(key)
+        if field_schema:
+            value = _coerce(value, field_schema)
+            errors = validate(value, field_schema, f"$.{key}")
+        item = key, value
+    else:
+        item_schema = schema.get('items')
+        if item_schema:
+            item = _coerce(item, item_schema)
+            errors = validate(item, item_schema, '$[]')
+
+    if errors:
+        raise StructuredOutputError(f"Streamed item does not match the expected format: {'; '.join(errors[:5])}", errors)
+    return item
+
+
+def sized(schema: Dict, min_items: int, max_items: Optional[int] = None) -> Dict:
+    """Copy of an array schema with item count limits"""
+    limits = {'min_items': min_items}
+    if max_items is not None:
+        limits['max_items'] = max_items
+    return {**schema, **limits}
+
+
+def parse_structured(text: str, schema: Dict) -> Any:
+    """
+    Extract JSON from a reply and validate it
+
+    Args:
+        text: LLM reply
+        schema: Expected shape
+
+    Returns:
+        The parsed, validated value
+
+    Raises:
+        StructuredOutputError: With the list of problems if parsing or validation failed
+    """
+    value = extract_json(text)
+    errors = validate(value, schema)
+    if errors:
+        raise StructuredOutputError(f"Reply does not match the expected format: {'; '.join(errors[:5])}", errors)
+    return value
@@ -0,0 +1,104 @@
+"""
+Tests for InterviewService's LLM reply handling
+Run with: python -m pytest backend/test_interview_service.py
+"""
+
+import json
+import types
+import concurrent.futures
+
+import pytest
+
+from interview_service import InterviewService
+from structured_output import EVALUATION_SCHEMA
+
+EVALUATION = {
+    "score": 80, "feedback": "f", "strengths": [], "improvements": [],
+    "key_points_covered": [], "missing_points": []
+}
+
+
+def reply(content: str):
+    return types.SimpleNamespace(choices=[types.SimpleNamespace(message=types.SimpleNamespace(content=content))])
+
+
+class FakeClient:
+    """
+    Answers submit() from a list: a reply string, or an exception to raise from submit itself;
+    stream() sends the next reply string in small chunks
+    """
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def submit(self, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        future = concurrent.futures.Future()
+        future.set_result(reply(outcome))
+        return future
+
+    def stream(self, **kwargs):
+        self.calls += 1
+        text = self.outcomes.pop(0)
+        for i in range(0, len(text), 7):
+            yield text[i:i + 7]
+
+
+def make_service(client: FakeClient) -> InterviewService:
+    service = InterviewService(api_key=None)
+    service.client = client
+    return service
+
+
+def question(n: int):
+    return {"type": "technical", "question": f"Question {n}?", "difficulty": "medium"}
+
+
+def stream_questions(service: InterviewService, num_questions: int):
+    """Drain stream_interview_questions; returns (streamed questions, return value)"""
+    stream = service.stream_interview_questions('Backend Engineer', 'APIs', num_questions=num_questions)
+    streamed = []
+    while True:
+        try:
+            streamed.append(next(stream))
+        except StopIteration as finished:
+            return streamed, finished.value
+
+
+def start_score(service: InterviewService) -> concurrent.futures.Future:
+    return service._start_json(
+        'score', schema=EVALUATION_SCHEMA, system_prompt='s', prompt='p',
+        temperature=0.3, max_tokens=100
+    )
+
+
+def test_repair_fixes_unusable_reply():
+    service = make_service(FakeClient('{"score": 80}', json.dumps(EVALUATION)))
+    assert start_score(service).result(timeout=5) == EVALUATION
+    assert service.client.calls == 2
+
+
+def test_failed_repair_submit_resolves_the_future():
+    service = make_service(FakeClient('not json', RuntimeError('client closed')))
+    with pytest.raises(RuntimeError, match='client closed'):
+        start_score(service).result(timeout=5)
+
+
+def test_stream_skips_brackets_in_the_preamble():
+    questions = [question(1), question(2)]
+    service = make_service(FakeClient(f"Here are [2] questions: {json.dumps(questions)}"))
+    assert stream_questions(service, 2) == (questions, questions)
+
+
+def test_stream_sends_no_invalid_question_and_returns_the_whole_fallback():
+    bad = {"type": "technical", "question": ["not", "text"], "difficulty": "easy"}
+    service = make_service(FakeClient(json.dumps([question(1), bad, question(3)])))
+    fallback = service._get_fallback_questions('Backend Engineer', 3)
+
+    streamed, final = stream_questions(service, 3)
+    assert streamed == [question(1)] + fallback[1:]
+    assert final == fallback
@@ -0,0 +1,51 @@
+"""
+Tests for LLMClient concurrency limiting
+Run with: python -m pytest backend/test_llm_client.py
+"""
+
+import time
+import asyncio
+import threading
+import types
+
+from llm_client import LLMClient
+
+
+class FakeCompletions:
+    """Stands in for chat.completions, recording how many calls overlap"""
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    async def create(self, **kwargs):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            with self._lock:
+                self.active -= 1
+        return types.SimpleNamespace(choices=[])
+
+
+def test_more_calls_than_max_concurrency():
+    client = LLMClient(api_key='test', max_concurrency=2)
+    fake = FakeCompletions()
+    client._client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=fake), close=client._client.close)
+    try:
+        started = time.perf_counter()
+        futures = [client.submit(model='m', messages=[]) for _ in range(7)]
+        for future in futures:
+            future.result(timeout=10)
+
+        assert fake.max_active == 2
+        assert client.get_stats()['requests'] == 7
+        assert client.get_stats()['in_flight'] == 0
+        # 7 calls two at a time take at least 4 rounds
+        assert time.perf_counter() - started >= 4 * fake.delay
+    finally:
+        client.close()
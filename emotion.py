@@ -1,19 +1,25 @@
 import cv2
 import numpy as np
 import tensorflow as tf
-from tensorflow.keras.preprocessing.image import img_to_array
 import os
+from backend.inference import CompiledPredictor
+from backend.frame_pipeline import PreparedFrame
+from backend.model_descriptor import ModelDescriptor
 
 # Suppress TensorFlow warnings
 os.environ['TF_CPP_MIN_LOG_LEVEL'] = '2'
 
 # Load the pre-trained emotion detection model
 print("[INFO] Loading model...")
-model = tf.keras.models.load_model('Final_Resnet50_Best_model.keras')
+model_file = 'Final_Resnet50_Best_model.keras'
+model = tf.keras.models.load_model(model_file)
 #model.summary()  # Optional: comment this after first test
 
-# Emotion labels (make sure these match your training labels)
-emotion_labels = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
+# Input format and label order (from the model's input shape, or a .json sidecar)
+descriptor = ModelDescriptor.from_model(model.input_shape, model_file)
+
+# Trace a fixed-signature inference function instead of calling model.predict per face
+predictor = CompiledPredictor(model, input_shape=descriptor.input_shape, batch_buckets=(1,))
 
 # Load Haar cascade for face detection
 print("[INFO] Loading face detector...")
@@ -33,22 +39,18 @@ while True:
         print("[WARN] Failed to grab frame")
         break
 
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_classifier.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
+    prepared = PreparedFrame(frame, detection_max_width=None)
+    faces = face_classifier.detectMultiScale(prepared.small_gray, scaleFactor=1.1, minNeighbors=5, minSize=(30, 30))
 
     for (x, y, w, h) in faces:
         cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
 
-        # Use color frame instead of grayscale to match model input (224x224x3)
-        face = frame[y:y + h, x:x + w]
-        face = cv2.resize(face, (224, 224))
-        face = face.astype("float") / 255.0
-        face = img_to_array(face)
-        face = np.expand_dims(face, axis=0)
+        # Crop from the color frame, resized and normalized to match the model input
+        face = prepared.crop_batch([(x, y, w, h)], **descriptor.crop_options)
 
         # Predict emotion
-        prediction = model.predict(face, verbose=0)[0]
-        emotion = emotion_labels[np.argmax(prediction)]
+        prediction = predictor.predict(face)[0]
+        emotion = descriptor.labels[np.argmax(prediction)]
         print(f"[PREDICTION] {emotion} ({prediction})")  # Debug
 
         # Display prediction
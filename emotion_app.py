@@ -1,7 +1,9 @@
 import cv2
 import numpy as np
 from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array
+from backend.inference import CompiledPredictor
+from backend.frame_pipeline import PreparedFrame
+from backend.model_descriptor import ModelDescriptor
 
 # Load the model - trying different models for TensorFlow 2.20 compatibility
 model_files = [
@@ -24,8 +26,13 @@ for model_file in model_files:
 if model is None:
     raise Exception("Failed to load any emotion detection model!")
 
-# Emotion labels (adjust if needed)
-emotion_labels = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
+# Input size, channels and labels come from the model (or its .json sidecar),
+# so the 48x48 grayscale CNN and the 224x224 ResNet50 both work
+descriptor = ModelDescriptor.from_model(model.input_shape, model_file)
+print(f"[INFO] {descriptor}")
+
+# Trace a fixed-signature inference function instead of calling model.predict per face
+predictor = CompiledPredictor(model, input_shape=descriptor.input_shape, batch_buckets=(1,))
 
 # Start video capture1
 cap = cv2.VideoCapture(0)
@@ -38,23 +45,19 @@ while True:
     if not ret:
         break
 
-    grayscale = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    faces = face_cascade.detectMultiScale(grayscale, scaleFactor=1.3, minNeighbors=5)
+    prepared = PreparedFrame(frame, detection_max_width=None)
+    faces = face_cascade.detectMultiScale(prepared.small_gray, scaleFactor=1.3, minNeighbors=5)
 
     for (x, y, w, h) in faces:
         # Draw bounding box
         cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
 
-        # ✅ Crop from COLOR frame
-        face = frame[y:y + h, x:x + w]
-        face = cv2.resize(face, (224, 224))
-        face = face.astype("float32") / 255.0
-        face = img_to_array(face)
-        face = np.expand_dims(face, axis=0)
+        # Crop, resize and normalize the face the way the model expects
+        face = prepared.crop_batch([(x, y, w, h)], **descriptor.crop_options)
 
         # Predict
-        prediction = model.predict(face, verbose=0)[0]
-        emotion = emotion_labels[np.argmax(prediction)]
+        prediction = predictor.predict(face)[0]
+        emotion = descriptor.labels[np.argmax(prediction)]
         print(f"[PREDICTION] {emotion}")
 
         # Put label
@@ -7,6 +7,8 @@ import EmotionResults from './EmotionResults'
 import ComprehensiveFeedback from './ComprehensiveFeedback'
 import { analyzeSession } from '../utils/feedbackAnalyzer'
 import { API_ENDPOINTS } from '../config/api'
+import { captureFrame, detectFrame } from '../utils/frameUpload'
+import { openDetectionStream } from '../utils/detectionStream'
 
 function EmotionDetector({ onBack }) {
   const webcamRef = useRef(null)
@@ -77,58 +79,68 @@ function EmotionDetector({ onBack }) {
       const startTime = Date.now()
       let frameCount = 0
 
+      const handleResult = (data) => {
+        console.log('Backend response:', data)
+
+        if (data.success) {
+          setEmotionData(data)
+          setError(null)
+
+          // Track session history
+          setSessionHistory(prev => [...prev, {
+            timestamp: Date.now(),
+            results: data.results
+          }])
+
+          // Show emotion label
+          if (data.results && data.results.length > 0) {
+            showEmotionLabel(data.results[0])
+            console.log(`Detected ${data.results.length} face(s)`)
+          } else {
+            // Clear canvas
+            const canvas = canvasRef.current
+            if (canvas) {
+              const ctx = canvas.getContext('2d')
+              ctx.clearRect(0, 0, canvas.width, canvas.height)
+            }
+            console.log('No faces detected in frame')
+          }
+
+          // Update FPS
+          const elapsed = (Date.now() - startTime) / 1000
+          setFps(Math.round(frameCount / elapsed))
+        } else {
+          setError(data.error || 'Detection failed')
+        }
+      }
+
+      // Prefer the persistent WebSocket; fall back to one HTTP POST per frame
+      const stream = openDetectionStream({ onResult: handleResult })
+
       const detectEmotion = async () => {
         if (webcamRef.current && !isLoading) {
           try {
-            setIsLoading(true)
-            frameCount++
-
-            const imageSrc = webcamRef.current.getScreenshot()
-            if (!imageSrc) {
+            const frame = await captureFrame(webcamRef.current)
+            if (!frame) {
               console.error('Failed to capture image from webcam')
               setError('Failed to capture image')
               return
             }
 
+            if (stream?.isOpen()) {
+              if (stream.send(frame)) frameCount++
+              return
+            }
+
+            setIsLoading(true)
+            frameCount++
+
             console.log('Sending image to backend...')
-            const response = await axios.post(API_ENDPOINTS.detect, {
-              image: imageSrc
-            }, {
+            const response = await detectFrame(frame, {
               timeout: 5000 // 5 second timeout
             })
 
-            console.log('Backend response:', response.data)
-
-            if (response.data.success) {
-              setEmotionData(response.data)
-              setError(null)
-
-              // Track session history
-              setSessionHistory(prev => [...prev, {
-                timestamp: Date.now(),
-                results: response.data.results
-              }])
-
-              // Show emotion label
-              if (response.data.results && response.data.results.length > 0) {
-                showEmotionLabel(response.data.results[0])
-                console.log(`Detected ${response.data.results.length} face(s)`)
-              } else {
-                // Clear canvas
-                const canvas = canvasRef.current
-                if (canvas) {
-                  const ctx = canvas.getContext('2d')
-                  ctx.clearRect(0, 0, canvas.width, canvas.height)
-                }
-                console.log('No faces detected in frame')
-              }
-
-              // Update FPS
-              const elapsed = (Date.now() - startTime) / 1000
-              setFps(Math.round(frameCount / elapsed))
-            } else {
-              setError('Detection failed')
-            }
+            handleResult(response.data)
           } catch (err) {
             console.error('Detection error:', err)
             const errorMsg = err.response?.data?.error || err.message || 'Failed to detect emotions'
@@ -155,6 +167,7 @@ function EmotionDetector({ onBack }) {
         if (detectionIntervalRef.current) {
           clearInterval(detectionIntervalRef.current)
         }
+        stream?.close()
       }
     }
   }, [isDetecting])
@@ -2,8 +2,7 @@ import { useState, useEffect, useRef } from 'react'
 import { motion, AnimatePresence } from 'framer-motion'
 import { ArrowLeft, Play, Pause, RotateCcw, Trophy, Star, Heart, Shield, Zap, Smile, Info } from 'lucide-react'
 import Webcam from 'react-webcam'
-import axios from 'axios'
-import { API_ENDPOINTS } from '../config/api'
+import { GAME_DETECT_CONFIG, captureFrame, detectFrame } from '../utils/frameUpload'
 
 function EmotionGameEasy({ onBack }) {
   const canvasRef = useRef(null)
@@ -108,12 +107,10 @@ function EmotionGameEasy({ onBack }) {
 
     const interval = setInterval(async () => {
       if (webcamRef.current) {
-        const imageSrc = webcamRef.current.getScreenshot()
-        if (imageSrc) {
+        const frame = await captureFrame(webcamRef.current)
+        if (frame) {
           try {
-            const response = await axios.post(API_ENDPOINTS.detect, {
-              image: imageSrc
-            })
+            const response = await detectFrame(frame, GAME_DETECT_CONFIG)
 
             if (response.data.success && response.data.results.length > 0) {
               const emotion = response.data.results[0].emotion
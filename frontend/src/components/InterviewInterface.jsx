@@ -4,6 +4,7 @@ import Webcam from 'react-webcam'
 import { Mic, MicOff, ArrowRight, CheckCircle, Clock, Brain } from 'lucide-react'
 import axios from 'axios'
 import { API_ENDPOINTS } from '../config/api'
+import { INTERVIEW_DETECT_CONFIG, captureFrame, createSessionId, detectFrame } from '../utils/frameUpload'
 
 const InterviewInterface = ({ interviewData, onComplete }) => {
   const [currentQuestionIndex, setCurrentQuestionIndex] = useState(0)
@@ -22,6 +23,8 @@ const InterviewInterface = ({ interviewData, onComplete }) => {
   const emotionIntervalRef = useRef(null)
   const recognitionRef = useRef(null)
   const isRecordingRef = useRef(false)
+  // The backend aggregates this interview's detections under its own session id
+  const interviewSessionIdRef = useRef(createSessionId())
 
   const currentQuestion = interviewData.questions[currentQuestionIndex]
 
@@ -196,13 +199,11 @@ const InterviewInterface = ({ interviewData, onComplete }) => {
     const detectEmotion = async () => {
       if (!webcamRef.current) return
 
-      const imageSrc = webcamRef.current.getScreenshot()
-      if (!imageSrc) return
+      const frame = await captureFrame(webcamRef.current)
+      if (!frame) return
 
       try {
-        const response = await axios.post(API_ENDPOINTS.detect, {
-          image: imageSrc
-        })
+        const response = await detectFrame(frame, INTERVIEW_DETECT_CONFIG, interviewSessionIdRef.current)
 
         if (response.data.success && response.data.results.length > 0) {
           const result = response.data.results[0]
@@ -258,33 +259,39 @@ const InterviewInterface = ({ interviewData, onComplete }) => {
     setIsProcessing(true)
 
     try {
-      // Score the answer
-      const response = await axios.post(API_ENDPOINTS.interview.score, {
-        question: currentQuestion.question,
-        answer: currentAnswer,
-        question_type: currentQuestion.type,
-        role: interviewData.role
-      })
-
       const answerData = {
         question: currentQuestion.question,
         type: currentQuestion.type,
         difficulty: currentQuestion.difficulty,
         answer: currentAnswer,
         timeSpent: timeElapsed,
-        evaluation: response.data.evaluation,
         emotions: emotions.filter(e => e.questionIndex === currentQuestionIndex)
       }
 
       const updatedAnswers = [...answers, answerData]
-      setAnswers(updatedAnswers)
 
       // Check if this was the last question
       if (currentQuestionIndex === interviewData.questions.length - 1) {
-        // Interview complete - calculate overall feedback
-        await completeInterview(updatedAnswers)
+        // Interview complete - score every answer in one request, then get overall feedback
+        const response = await axios.post(API_ENDPOINTS.interview.scoreAll, {
+          role: interviewData.role,
+          answers: updatedAnswers.map(a => ({
+            question: a.question,
+            answer: a.answer,
+            question_type: a.type
+          }))
+        })
+
+        const scoredAnswers = updatedAnswers.map((a, i) => ({
+          ...a,
+          evaluation: response.data.evaluations[i]
+        }))
+        setAnswers(scoredAnswers)
+
+        await completeInterview(scoredAnswers)
       } else {
         // Move to next question
+        setAnswers(updatedAnswers)
         setCurrentQuestionIndex(prev => prev + 1)
         setCurrentAnswer('')
         setTimeElapsed(0)
@@ -299,44 +306,6 @@ const InterviewInterface = ({ interviewData, onComplete }) => {
 
   const completeInterview = async (allAnswers) => {
     try {
-      // Calculate emotion statistics
-      const emotionCounts = {}
-      emotions.forEach(e => {
-        emotionCounts[e.emotion] = (emotionCounts[e.emotion] || 0) + 1
-      })
-
-      const dominantEmotions = Object.entries(emotionCounts)
-        .sort((a, b) => b[1] - a[1])
-        .slice(0, 3)
-        .map(([emotion]) => emotion)
-
-      const avgConfidence = emotions.reduce((sum, e) => sum + e.confidence, 0) / emotions.length
-
-      const nervousMoments = emotions.filter(e =>
-        ['Fear', 'Sad', 'Angry'].includes(e.emotion)
-      ).length
-
-      // Calculate facial analysis aggregates
-      const avgEyeContact = emotions.reduce((sum, e) => sum + (e.eyeContact || 0), 0) / emotions.length
-      const avgConfidenceScore = emotions.reduce((sum, e) => sum + (e.confidenceScore || 0), 0) / emotions.length
-      const avgEngagement = emotions.reduce((sum, e) => sum + (e.engagementScore || 0), 0) / emotions.length
-
-      // Count good eye contact moments (>70%)
-      const goodEyeContactMoments = emotions.filter(e => (e.eyeContact || 0) > 0.7).length
-      const eyeContactPercentage = (goodEyeContactMoments / emotions.length) * 100
-
-      const emotionData = {
-        dominant_emotions: dominantEmotions,
-        avg_confidence: avgConfidence,
-        nervous_moments: nervousMoments,
-        total_emotions_detected: emotions.length,
-        // Add facial analysis metrics
-        avg_eye_contact: avgEyeContact,
-        avg_confidence_score: avgConfidenceScore,
-        avg_engagement: avgEngagement,
-        eye_contact_percentage: eyeContactPercentage
-      }
-
       // Get overall feedback
       const questionsAndScores = allAnswers.map(a => ({
         question: a.question,
@@ -348,13 +317,14 @@ const InterviewInterface = ({ interviewData, onComplete }) => {
       const response = await axios.post(API_ENDPOINTS.interview.feedback, {
         role: interviewData.role,
         questions_and_scores: questionsAndScores,
-        emotion_data: emotionData
+        // Emotion statistics are aggregated server-side from this session's detections
+        session_id: interviewSessionIdRef.current
       })
 
       onComplete({
         answers: allAnswers,
         overallFeedback: response.data.feedback,
-        emotionData,
+        emotionData: response.data.emotion_data || {},
         totalTimeSpent: allAnswers.reduce((sum, a) => sum + a.timeSpent, 0)
       })
     } catch (error) {
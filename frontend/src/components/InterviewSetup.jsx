@@ -2,6 +2,7 @@ import { useState } from 'react'
 import { motion } from 'framer-motion'
 import { Briefcase, FileText, Award, ArrowRight, Sparkles } from 'lucide-react'
 import { API_ENDPOINTS } from '../config/api'
+import { postEventStream } from '../utils/eventStream'
 
 const InterviewSetup = ({ onStart }) => {
   const [formData, setFormData] = useState({
@@ -13,6 +14,7 @@ const InterviewSetup = ({ onStart }) => {
 
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState(null)
+  const [questionsReady, setQuestionsReady] = useState(0)
 
   const handleChange = (e) => {
     const { name, value } = e.target
@@ -32,23 +34,21 @@ const InterviewSetup = ({ onStart }) => {
 
     setLoading(true)
     setError(null)
+    setQuestionsReady(0)
 
     try {
-      const response = await fetch(API_ENDPOINTS.interview.generate, {
-        method: 'POST',
-        headers: {
-          'Content-Type': 'application/json'
-        },
-        body: JSON.stringify({
-          role: formData.role,
-          job_description: formData.jobDescription,
-          experience_level: formData.experienceLevel,
-          num_questions: parseInt(formData.numQuestions)
-        })
+      // Questions stream in one at a time so progress shows while the rest are generated
+      const data = await postEventStream(API_ENDPOINTS.interview.generateStream, {
+        role: formData.role,
+        job_description: formData.jobDescription,
+        experience_level: formData.experienceLevel,
+        num_questions: parseInt(formData.numQuestions)
+      }, (event) => {
+        if (event === 'question') {
+          setQuestionsReady(count => count + 1)
+        }
       })
 
-      const data = await response.json()
-
       if (data.success) {
         onStart({
           ...formData,
@@ -194,7 +194,9 @@ const InterviewSetup = ({ onStart }) => {
               {loading ? (
                 <>
                   <div className="w-5 h-5 border-2 border-white border-t-transparent rounded-full animate-spin" />
-                  Generating Questions...
+                  {questionsReady > 0
+                    ? `Generating Questions (${questionsReady}/${formData.numQuestions})...`
+                    : 'Generating Questions...'}
                 </>
               ) : (
                 <>
@@ -5,10 +5,13 @@ export const API_BASE_URL = import.meta.env.VITE_API_URL || 'http://localhost:50
 // API Endpoints
 export const API_ENDPOINTS = {
   detect: `${API_BASE_URL}/api/detect`,
+  detectStream: `${API_BASE_URL.replace(/^http/, 'ws')}/ws/detect`,
   health: `${API_BASE_URL}/api/health`,
   interview: {
     generate: `${API_BASE_URL}/api/interview/generate-questions`,
+    generateStream: `${API_BASE_URL}/api/interview/generate-questions/stream`,
     score: `${API_BASE_URL}/api/interview/score-answer`,
+    scoreAll: `${API_BASE_URL}/api/interview/score-answers`,
     feedback: `${API_BASE_URL}/api/interview/overall-feedback`,
   },
 };
@@ -0,0 +1,37 @@
+/**
+ * Detection Stream
+ * Long-lived WebSocket to /ws/detect: push binary frames, receive results as they complete
+ */
+
+import { API_ENDPOINTS } from '../config/api'
+import { DETECTION_SESSION_ID } from './frameUpload'
+
+export function openDetectionStream({ onResult, onError } = {}) {
+  let socket
+  try {
+    socket = new WebSocket(`${API_ENDPOINTS.detectStream}?session_id=${DETECTION_SESSION_ID}`)
+  } catch (err) {
+    console.warn('WebSocket unavailable, falling back to HTTP:', err)
+    return null
+  }
+
+  socket.onmessage = (event) => {
+    const data = JSON.parse(event.data)
+    if (data.type === 'pong') return
+    onResult?.(data)
+  }
+  socket.onerror = (event) => onError?.(event)
+
+  return {
+    isOpen: () => socket.readyState === WebSocket.OPEN,
+    // Skip this frame if the previous one is still being uploaded
+    send: (frame) => {
+      if (socket.readyState !== WebSocket.OPEN || socket.bufferedAmount > 0) {
+        return false
+      }
+      socket.send(frame)
+      return true
+    },
+    close: () => socket.close()
+  }
+}
@@ -0,0 +1,50 @@
+/**
+ * Event Stream
+ * POSTs JSON to a Server-Sent Events endpoint and dispatches each event as it arrives
+ * (EventSource only supports GET, so the stream is read with fetch)
+ */
+
+// Resolves with the "done" event's payload; rejects on an "error" event or HTTP error
+export async function postEventStream(url, body, onEvent = () => {}) {
+  const response = await fetch(url, {
+    method: 'POST',
+    headers: { 'Content-Type': 'application/json' },
+    body: JSON.stringify(body)
+  })
+
+  if (!response.ok) {
+    const data = await response.json().catch(() => ({}))
+    throw new Error(data.error || `Request failed with status ${response.status}`)
+  }
+
+  const reader = response.body.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { value, done } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    // Events are separated by a blank line
+    let boundary
+    while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, boundary)
+      buffer = buffer.slice(boundary + 2)
+
+      let event = 'message'
+      let data = ''
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+      }
+      const payload = data ? JSON.parse(data) : null
+
+      if (event === 'done') return payload
+      if (event === 'error') throw new Error(payload?.error || 'Stream failed')
+      onEvent(event, payload)
+    }
+  }
+
+  throw new Error('Stream ended unexpectedly')
+}
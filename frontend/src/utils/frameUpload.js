@@ -0,0 +1,44 @@
+/**
+ * Frame Upload
+ * Sends webcam frames to /api/detect as raw JPEG bytes instead of base64 JSON
+ */
+
+import axios from 'axios'
+import { API_ENDPOINTS } from '../config/api'
+
+// Random id naming a detection session on the backend
+export function createSessionId() {
+  return window.crypto?.randomUUID?.() ||
+    `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}`
+}
+
+// One detection session per page load so the backend can track the face across frames
+export const DETECTION_SESSION_ID = createSessionId()
+
+// Capture the current webcam frame as a binary Blob (null if the camera is not ready)
+export function captureFrame(webcam, type = 'image/jpeg', quality = 0.92) {
+  const canvas = webcam?.getCanvas()
+  if (!canvas) {
+    return Promise.resolve(null)
+  }
+  return new Promise(resolve => canvas.toBlob(resolve, type, quality))
+}
+
+// Games only need the dominant emotion, so they ask for the cheap-first model cascade
+// (small CNN, ResNet50 only for faces it is unsure about)
+export const GAME_DETECT_CONFIG = { headers: { 'X-Model-Policy': 'cascade' } }
+
+// Marks the session as an interview so the backend aggregates its detections for overall feedback
+export const INTERVIEW_DETECT_CONFIG = { headers: { 'X-Interview': '1' } }
+
+// POST a captured frame; the response has the same schema as the JSON upload
+export function detectFrame(frame, config = {}, sessionId = DETECTION_SESSION_ID) {
+  return axios.post(API_ENDPOINTS.detect, frame, {
+    ...config,
+    headers: {
+      ...config.headers,
+      'Content-Type': frame.type || 'image/jpeg',
+      'X-Session-Id': sessionId
+    }
+  })
+}
@@ -1,18 +1,25 @@
 # Import necessary libraries
 from keras.models import load_model
 import cv2
-import numpy as np
+from backend.inference import CompiledPredictor
+from backend.frame_pipeline import PreparedFrame
+from backend.model_descriptor import ModelDescriptor
 
 # Initialize the face classifier with the Haar Cascade model for face detection
 face_classifier = cv2.CascadeClassifier(r'haarcascade_frontalface_default.xml')
 
 # Load the pre-trained emotion classification model
 # Uncomment the model you want to use and make sure the path is correct
-classifier = load_model(r'Custom_CNN_model.keras')
-# classifier = load_model(r'Final_Resnet50_Best_model.keras')
+model_file = r'Custom_CNN_model.keras'
+# model_file = r'Final_Resnet50_Best_model.keras'
+classifier = load_model(model_file)
 
-# Define the list of emotion labels
-emotion_labels = ['Angry', 'Disgust', 'Fear', 'Happy', 'Neutral', 'Sad', 'Surprise']
+# Input size (48x48 grayscale for the custom CNN), normalization and label order
+# are read from the model's input shape or its .json sidecar
+descriptor = ModelDescriptor.from_model(classifier.input_shape, model_file)
+
+# Trace a fixed-signature inference function instead of calling classifier.predict per face
+predictor = CompiledPredictor(classifier, input_shape=descriptor.input_shape, batch_buckets=(1,))
 
 # Start capturing video from the webcam (device 0 by default)
 cap = cv2.VideoCapture(0)
@@ -23,29 +30,26 @@ while True:
     _, frame = cap.read()
 
     # Convert the frame to grayscale for the face detection
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    prepared = PreparedFrame(frame, detection_max_width=None)
+    gray = prepared.small_gray
 
     # Detect faces in the grayscale frame
     faces = face_classifier.detectMultiScale(gray)
 
     # Process each face detected
     for (x, y, w, h) in faces:
+        # Crop the face and resize/normalize it to the model input (48x48 grayscale for the custom CNN)
+        # before the rectangle is drawn onto the frame
+        roi = prepared.crop_batch([(x, y, w, h)], **descriptor.crop_options)
+
         # Draw a rectangle around each detected face
         cv2.rectangle(frame, (x, y), (x+w, y+h), (0, 255, 255), 2)
 
-        # Extract the region of interest (ROI) as the face area from the grayscale frame
-        roi_gray = gray[y:y+h, x:x+w]
-        # Resize the ROI to the size expected by the model (48x48 pixels in this case)
-        roi_gray = cv2.resize(roi_gray, (48, 48), interpolation=cv2.INTER_AREA)
-
         # Proceed if the ROI is not empty
-        if np.sum([roi_gray]) != 0:
-            roi = roi_gray.astype('float') / 255.0  # Normalize pixel values
-            roi = np.expand_dims(roi, axis=0)  # Add batch dimension
-
+        if roi.any():
             # Predict the emotion of the face using the pre-trained model
-            prediction = classifier.predict(roi)[0]
-            label = emotion_labels[prediction.argmax()]
+            prediction = predictor.predict(roi)[0]
+            label = descriptor.labels[prediction.argmax()]
             label_position = (x, y)
 
             # Display the predicted emotion label on the frame